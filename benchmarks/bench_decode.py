@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Microbenchmark: library WorkingInfo parser vs. the zero-copy decoder.
+
+Run from the repository root:
+
+    python benchmarks/bench_decode.py [--frames N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from evmeter_client.parser import parse_blewifi_payload  # noqa: E402
+
+from custom_components.evmeter.decoder import decode_response  # noqa: E402
+from simulator import build_working_info_frame  # noqa: E402
+
+
+def legacy_decode(payload: bytes) -> dict[str, Any]:
+    """Decode the way evmeter_client does: via a hex string."""
+    decoded: dict[str, Any] = parse_blewifi_payload(payload.hex())
+    return decoded
+
+
+def fast_decode(payload: bytes) -> dict:
+    """Decode with the zero-copy decoder."""
+    return decode_response(payload)
+
+
+def frames_per_second(decode, payload: bytes, frames: int, repeat: int = 5) -> float:
+    """Return the best decode rate over several runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(frames):
+            decode(payload)
+        best = min(best, time.perf_counter() - start)
+    return frames / best
+
+
+def allocations_per_frame(decode, payload: bytes, frames: int) -> tuple[float, float]:
+    """Return (blocks, bytes) still allocated per decoded frame it returned."""
+    gc.collect()
+    tracemalloc.start()
+    before_blocks = sys.getallocatedblocks()
+    before_bytes, _ = tracemalloc.get_traced_memory()
+    results = [decode(payload) for _ in range(frames)]
+    blocks = (sys.getallocatedblocks() - before_blocks) / frames
+    retained = (tracemalloc.get_traced_memory()[0] - before_bytes) / frames
+    tracemalloc.stop()
+    del results
+    return blocks, retained
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    payload = build_working_info_frame()
+    print(f"{'decoder':<10} {'frames/s':>12} {'blocks/frame':>14} {'bytes/frame':>12}")
+    rates = {}
+    for name, decode in (("library", legacy_decode), ("zerocopy", fast_decode)):
+        rates[name] = frames_per_second(decode, payload, args.frames)
+        blocks, retained = allocations_per_frame(decode, payload, args.frames // 10)
+        print(f"{name:<10} {rates[name]:>12,.0f} {blocks:>14.1f} {retained:>12,.0f}")
+    print(f"speedup: {rates['zerocopy'] / rates['library']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the decode, coordinator and entity update hot paths.
+
+Run from the repository root:
+
+    python benchmarks/suite.py                      # print results
+    python benchmarks/suite.py --save results.json  # write a results file
+    python benchmarks/suite.py --compare benchmarks/baseline.json
+
+With ``--compare``, benchmarks whose median got slower than the baseline's
+by more than ``--threshold`` plus the run-to-run noise of both runs are
+listed and the exit code is 1, so a regression is visible before a release.
+Results files are JSON:
+
+    {
+      "version": 2,
+      "python": "3.11.7",
+      "platform": "Linux-...",
+      "benchmarks": {
+        "<name>": {
+          "ops": <int>, "median_us": <float>, "best_us": <float>, "spread": <float>
+        }
+      }
+    }
+
+Each repeat times ``ops`` operations. ``median_us`` and ``best_us`` are the
+median and best mean time per operation over the repeats, and ``spread`` is
+half their interquartile range relative to the median. The fan-out
+benchmarks count one operation as a refresh of every charger.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from types import SimpleNamespace
+from typing import Any, cast
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.evmeter.api import (  # noqa: E402
+    ChargerSnapshot,
+    EVMeterApiClient,
+    snapshot_from_response,
+)
+from custom_components.evmeter.coordinator import EVMeterCoordinator  # noqa: E402
+from custom_components.evmeter.decoder import decode_response  # noqa: E402
+from custom_components.evmeter.sensor import (  # noqa: E402
+    SENSOR_TYPES,
+    EVMeterSensor,
+)
+from custom_components.evmeter.timing import StageTimings  # noqa: E402
+from simulator import build_working_info_frame  # noqa: E402
+
+RESULTS_VERSION = 2
+FANOUT_SIZES = (1, 50, 500)
+# Spreads of the two runs, in multiples, added to the regression threshold
+NOISE_FACTOR = 3
+
+Benchmark = Callable[[], Awaitable[None]]
+
+
+class FakeClient:
+    """Answer snapshot requests by decoding a canned frame, without MQTT."""
+
+    def __init__(self) -> None:
+        """Initialize the client."""
+        self.config = SimpleNamespace(response_timeout=10)
+        self.timings = StageTimings()
+        self._frame = build_working_info_frame()
+
+    async def async_wait_connected(self, timeout: float) -> None:
+        """Return at once; the fake client is always connected."""
+
+    def set_timeout_bounds(
+        self, charger_id: str, min_timeout: float, max_timeout: float
+    ) -> None:
+        """Accept timeout bounds; the fake client never times out."""
+
+    def add_frame_listener(
+        self, charger_id: str, listener: Callable
+    ) -> Callable[[], None]:
+        """Accept a listener that is never called."""
+        return lambda: None
+
+    async def get_charger_snapshot(self, charger_id: str) -> ChargerSnapshot:
+        """Decode the canned frame as the real client does a response."""
+        return snapshot_from_response(charger_id, decode_response(self._frame))
+
+
+def _fleet(
+    hass: HomeAssistant, client: EVMeterApiClient, chargers: int
+) -> list[EVMeterCoordinator]:
+    """Create coordinators with every sensor listening, as after setup."""
+    coordinators = []
+    for index in range(chargers):
+        coordinator = EVMeterCoordinator(hass, client, str(100000 + index))
+        for description in SENSOR_TYPES:
+            sensor = EVMeterSensor(coordinator, description)
+            # Stand in for the state machine write with the state it would read
+            sensor.async_write_ha_state = lambda sensor=sensor: sensor.native_value
+            coordinator.async_add_listener(sensor._handle_coordinator_update)
+        coordinators.append(coordinator)
+    return coordinators
+
+
+async def _build(hass: HomeAssistant) -> dict[str, Benchmark]:
+    """Return the benchmarks by name."""
+    # The coordinator only uses the part of the client the fake implements
+    client = cast(EVMeterApiClient, FakeClient())
+    frame = build_working_info_frame()
+
+    async def decode() -> None:
+        decode_response(frame)
+
+    coordinator = EVMeterCoordinator(hass, client, "123456")
+
+    async def coordinator_cycle() -> None:
+        await coordinator._async_update_data()
+
+    coordinator.data = await coordinator._async_update_data()
+    sensors = [EVMeterSensor(coordinator, description) for description in SENSOR_TYPES]
+
+    async def native_value() -> None:
+        for sensor in sensors:
+            sensor.native_value  # pylint: disable=pointless-statement
+
+    benchmarks: dict[str, Benchmark] = {
+        "decode": decode,
+        "coordinator_cycle": coordinator_cycle,
+        "sensor_native_value_all": native_value,
+    }
+    for size in FANOUT_SIZES:
+        fleet = _fleet(hass, client, size)
+
+        async def fanout(fleet: list[EVMeterCoordinator] = fleet) -> None:
+            await asyncio.gather(*(member.async_refresh() for member in fleet))
+
+        benchmarks[f"fanout_{size}"] = fanout
+    return benchmarks
+
+
+async def _measure(benchmark: Benchmark, min_time: float, repeat: int) -> dict:
+    """Return the operation count and the spread of its mean time per op."""
+    # Calibrate the number of operations to run for about min_time
+    ops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(ops):
+            await benchmark()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or ops >= 1_000_000:
+            break
+        ops *= 10
+    ops = max(1, round(ops * min_time / max(elapsed, 1e-9)))
+
+    means = []
+    for _ in range(repeat):
+        # Collector pauses land in whichever repeat they happen to hit
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(ops):
+                await benchmark()
+            means.append((time.perf_counter() - start) / ops)
+        finally:
+            gc.enable()
+    median = statistics.median(means)
+    spread = 0.0
+    if len(means) > 1:
+        lower, _, upper = statistics.quantiles(means, n=4)
+        spread = (upper - lower) / 2 / median
+    return {
+        "ops": ops,
+        "median_us": round(median * 1e6, 3),
+        "best_us": round(min(means) * 1e6, 3),
+        "spread": round(spread, 4),
+    }
+
+
+async def run_suite(
+    only: list[str] | None, min_time: float, repeat: int
+) -> dict[str, Any]:
+    """Run the benchmarks and return a results document."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        benchmarks = await _build(hass)
+        results = {}
+        for name, benchmark in benchmarks.items():
+            if only and name not in only:
+                continue
+            results[name] = await _measure(benchmark, min_time, repeat)
+            print(
+                f"{name:<26} {results[name]['median_us']:>14,.3f} us/op "
+                f"(±{results[name]['spread']:.1%})"
+            )
+        await hass.async_stop(force=True)
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print the change against a baseline and return the regressed names.
+
+    A slowdown only counts once it exceeds the threshold plus
+    ``NOISE_FACTOR`` times the spread of both runs, so a noisy benchmark
+    needs a larger change to be flagged.
+    """
+    if (version := baseline.get("version")) != RESULTS_VERSION:
+        raise SystemExit(
+            f"Baseline is results version {version}, expected "
+            f"{RESULTS_VERSION}; regenerate it with --save"
+        )
+    regressions = []
+    print(
+        f"\n{'benchmark':<26} {'baseline':>12} {'now':>12} {'change':>8} "
+        f"{'allowed':>8}"
+    )
+    for name, result in results["benchmarks"].items():
+        if (reference := baseline["benchmarks"].get(name)) is None:
+            continue
+        change = result["median_us"] / reference["median_us"] - 1
+        allowed = threshold + NOISE_FACTOR * (result["spread"] + reference["spread"])
+        flag = ""
+        if change > allowed:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<26} {reference['median_us']:>12,.3f} "
+            f"{result['median_us']:>12,.3f} {change:>+8.1%} {allowed:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    """Run the suite, then save and compare the results as asked."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help="only run these benchmarks")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against this results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="slowdown beyond the noise that counts as a regression (0.25 = 25%%)",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args.benchmarks, args.min_time, args.repeat))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if regressions := compare(results, baseline, args.threshold):
+            print(f"\nRegressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
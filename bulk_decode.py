@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Bulk-decode captured WorkingInfo frames into NumPy columns.
+
+Frames only differ in layout by the lengths of their two length-prefixed
+strings (kubis version and WiFi network). Frames are grouped by those lengths
+and every group is decoded in one pass with a NumPy structured dtype, with the
+0.25 V and 0.1 A scaling applied to whole columns.
+
+Capture files hold one hex-encoded frame per line: either a whole
+/BLEWIFI/users response, like the ``payload`` of a frame in the config entry
+diagnostics, or just its inner payload, as printed by analyze_response.py.
+Blank lines and lines starting with ``#`` are skipped.
+
+Usage:
+    python bulk_decode.py capture.txt [--output columns.npz]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+
+try:
+    import numpy as np
+except ImportError as err:  # pragma: no cover - depends on the environment
+    raise SystemExit(
+        "bulk_decode.py needs NumPy: pip install numpy (or poetry install)"
+    ) from err
+
+# Message type byte of a WorkingInfo inner payload (PROTOCOL.md 4.2)
+WORKING_INFO_TYPE = 0x03
+
+# Offsets within a raw response: 2-byte outer length, then the inner payload
+_TYPE_OFFSET = 2
+_KUBIS_LENGTH_OFFSET = 2 + 6
+# Fixed-width run between the two strings (PROTOCOL.md 4.2)
+_MEASUREMENTS_SIZE = 32
+_TRAILER_SIZE = 41
+
+# Fixed-width runs as (name, dtype), little-endian per PROTOCOL.md 4.2
+_HEAD_FIELDS = [("type", "u1"), ("status", "u1"), ("evse", "<u4")]
+_MEASUREMENT_FIELDS = [
+    ("ev_status", "u1"),
+    ("charging_state", "u1"),
+    ("warnings", "u1"),
+    ("errors", "u1"),
+    ("voltage_ph1", "<u2"),
+    ("voltage_ph2", "<u2"),
+    ("voltage_ph3", "<u2"),
+    ("current_ph1", "<u2"),
+    ("current_ph2", "<u2"),
+    ("current_ph3", "<u2"),
+    ("session_energy_wh", "<u4"),
+    ("total_energy_wh", "<u4"),
+    ("phase_type", "u1"),
+    ("set_current", "u1"),
+    ("firmware_version", "<u2"),
+    ("limit", "<u4"),
+]
+_TRAILER_FIELDS = [
+    ("grid_type", "u1"),
+    ("mqtt_type", "u1"),
+    ("charger_id", "<u8"),
+    ("start_time", "<u8"),
+    ("scheduler_version", "<u4"),
+    ("circuit_breaker", "<u4"),
+    ("dlm_current_ph1", "<u2"),
+    ("dlm_current_ph2", "<u2"),
+    ("dlm_current_ph3", "<u2"),
+    ("temperature", "u1"),
+    ("peer_serial_number", "<u4"),
+    ("avg_ping_latency", "<u4"),
+]
+
+# Raw wire units -> engineering units
+_SCALES = {
+    "voltage_ph1": 0.25,
+    "voltage_ph2": 0.25,
+    "voltage_ph3": 0.25,
+    "current_ph1": 0.1,
+    "current_ph2": 0.1,
+    "current_ph3": 0.1,
+    "dlm_current_ph1": 0.1,
+    "dlm_current_ph2": 0.1,
+    "dlm_current_ph3": 0.1,
+}
+
+
+def _layout_dtype(kubis_length: int, wifi_length: int) -> np.dtype:
+    """Return the packed record dtype for one string-length layout."""
+    return np.dtype(
+        [("length", "<u2")]
+        + _HEAD_FIELDS
+        + [("kubis_length", "<u2"), ("kubis_version", f"S{kubis_length}")]
+        + _MEASUREMENT_FIELDS
+        + [("wifi_length", "<u2"), ("wifi_network", f"S{wifi_length}")]
+        + _TRAILER_FIELDS
+    )
+
+
+def _layout(frame: bytes) -> tuple[int, int] | None:
+    """Return the (kubis, wifi) string lengths of a frame, or None if invalid."""
+    if len(frame) < _KUBIS_LENGTH_OFFSET + 2 or frame[_TYPE_OFFSET] != (
+        WORKING_INFO_TYPE
+    ):
+        return None
+    kubis_length = int.from_bytes(
+        frame[_KUBIS_LENGTH_OFFSET : _KUBIS_LENGTH_OFFSET + 2], "little"
+    )
+    wifi_offset = _KUBIS_LENGTH_OFFSET + 2 + kubis_length + _MEASUREMENTS_SIZE
+    if len(frame) < wifi_offset + 2:
+        return None
+    wifi_length = int.from_bytes(frame[wifi_offset : wifi_offset + 2], "little")
+    inner_length = int.from_bytes(frame[:2], "little")
+    needed = wifi_offset + 2 + wifi_length + _TRAILER_SIZE
+    if needed > len(frame) or needed > inner_length + 2:
+        return None
+    return kubis_length, wifi_length
+
+
+def decode_frames(frames: Sequence[bytes]) -> dict[str, np.ndarray]:
+    """Decode raw responses into columns, one row per input frame.
+
+    The ``valid`` column marks rows that held a complete WorkingInfo frame;
+    the other columns are zero for invalid rows.
+    """
+    groups: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for index, frame in enumerate(frames):
+        if (layout := _layout(frame)) is not None:
+            groups[layout].append(index)
+
+    count = len(frames)
+    columns: dict[str, np.ndarray] = {"valid": np.zeros(count, dtype=bool)}
+    numeric_fields = _HEAD_FIELDS + _MEASUREMENT_FIELDS + _TRAILER_FIELDS
+    for name, dtype in numeric_fields:
+        columns[name] = np.zeros(
+            count, dtype=np.float64 if name in _SCALES else np.dtype(dtype)
+        )
+    max_kubis = max((layout[0] for layout in groups), default=0)
+    max_wifi = max((layout[1] for layout in groups), default=0)
+    columns["kubis_version"] = np.zeros(count, dtype=f"S{max(max_kubis, 1)}")
+    columns["wifi_network"] = np.zeros(count, dtype=f"S{max(max_wifi, 1)}")
+
+    for (kubis_length, wifi_length), indexes in groups.items():
+        record_dtype = _layout_dtype(kubis_length, wifi_length)
+        size = record_dtype.itemsize
+        # One contiguous buffer per layout; trailing user data is dropped
+        records = np.frombuffer(
+            b"".join(frames[index][:size] for index in indexes), dtype=record_dtype
+        )
+        rows = np.asarray(indexes)
+        columns["valid"][rows] = True
+        for name, _ in numeric_fields:
+            if (scale := _SCALES.get(name)) is not None:
+                columns[name][rows] = records[name] * scale
+            else:
+                columns[name][rows] = records[name]
+        columns["kubis_version"][rows] = records["kubis_version"]
+        columns["wifi_network"][rows] = records["wifi_network"]
+
+    columns["power_kw"] = (
+        columns["voltage_ph1"] * columns["current_ph1"]
+        + columns["voltage_ph2"] * columns["current_ph2"]
+        + columns["voltage_ph3"] * columns["current_ph3"]
+    ) / 1000.0
+    columns["session_energy_kwh"] = columns["session_energy_wh"] / 1000.0
+    columns["total_energy_kwh"] = columns["total_energy_wh"] / 1000.0
+    columns["unlimited"] = columns["limit"] == 0xFFFFFFFF
+    return columns
+
+
+def _with_length_header(frame: bytes) -> bytes:
+    """Return a captured frame as a whole response.
+
+    An inner payload, which lacks the 2-byte length header, gets one added
+    when only that makes it a complete WorkingInfo frame.
+    """
+    if _layout(frame) is None:
+        response = len(frame).to_bytes(2, "little") + frame
+        if _layout(response) is not None:
+            return response
+    return frame
+
+
+def read_capture(lines: Iterable[str]) -> list[bytes]:
+    """Read hex-encoded responses or inner payloads, one per line."""
+    return [
+        _with_length_header(bytes.fromhex(line))
+        for line in (raw.strip() for raw in lines)
+        if line and not line.startswith("#")
+    ]
+
+
+def main() -> None:
+    """Decode a capture file and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="file with one hex frame per line")
+    parser.add_argument("--output", help="write the columns to this .npz file")
+    args = parser.parse_args()
+
+    with open(args.capture, encoding="ascii") as capture:
+        frames = read_capture(capture)
+
+    start = time.perf_counter()
+    columns = decode_frames(frames)
+    elapsed = time.perf_counter() - start
+
+    valid = columns["valid"]
+    print(f"Frames:  {len(frames):,} ({int(valid.sum()):,} valid WorkingInfo)")
+    print(f"Decoded: {elapsed:.3f}s ({len(frames) / max(elapsed, 1e-9):,.0f} frames/s)")
+    if not valid.any():
+        print(
+            "Warning: no line held a complete WorkingInfo frame. Lines must be "
+            "hex responses or inner payloads of message type 0x03.",
+            file=sys.stderr,
+        )
+    else:
+        power = columns["power_kw"][valid]
+        print(f"Power:   mean {power.mean():.2f} kW, max {power.max():.2f} kW")
+        print(f"Chargers: {len(np.unique(columns['charger_id'][valid])):,}")
+
+    if args.output:
+        # The stubs match keyword arrays against allow_pickle, new in NumPy 2.1
+        np.savez(args.output, **columns)  # type: ignore[arg-type]
+        print(f"Columns written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
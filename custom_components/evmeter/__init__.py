@@ -3,13 +3,20 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
+from evmeter_client import EVMeterConfig
+
+from .const import CONF_CHARGER_IDS, DOMAIN
 from .coordinator import EVMeterCoordinator
+from .fleet import get_fleet
+from .pool import get_connection_pool
+from .storage import EVMeterSnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,26 +24,90 @@ _LOGGER = logging.getLogger(__name__)
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up EV-Meter EV Charger from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
+def entry_charger_ids(data: Mapping[str, Any]) -> list[str]:
+    """Return the chargers a config entry owns."""
+    if CONF_CHARGER_IDS in data:
+        return list(data[CONF_CHARGER_IDS])
+    return [data["charger_id"]]
 
-    charger_id = entry.data["charger_id"]
-    coordinator = EVMeterCoordinator(hass, entry.data, charger_id)
 
-    await coordinator.async_config_entry_first_refresh()
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up EV-Meter EV Charger from a config entry.
+
+    An entry owns one charger, or a fleet of chargers of one user. Every
+    charger gets its own coordinator; all of them share the entry's client.
 
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+    Setup does not wait for the broker or the chargers. Entities are added
+    at once and the first refresh runs in the background, so an offline
+    charger or a slow broker does not hold up Home Assistant startup. Until
+    it succeeds, each charger shows the last frame saved before the restart.
+    """
+    hass.data.setdefault(DOMAIN, {})
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Per PRD: MQTT settings are hardcoded; entries of the same user share
+    # one connection
+    pool = get_connection_pool(hass)
+    client = pool.acquire(EVMeterConfig(user_id=entry.data["user_id"]))
+
+    # Chargers of one user are polled together, across entries
+    fleet = get_fleet(hass, client)
+    coordinators: dict[str, EVMeterCoordinator] = {}
+    try:
+        store = EVMeterSnapshotStore(hass, entry.entry_id)
+        saved = await store.async_load()
+        for charger_id in entry_charger_ids(entry.data):
+            coordinator = coordinators[charger_id] = EVMeterCoordinator(
+                hass, client, charger_id, entry.options, fleet, store
+            )
+            if charger_id in saved:
+                coordinator.async_restore(*saved[charger_id])
+        entry.async_on_unload(store.async_flush)
+
+        hass.data[DOMAIN][entry.entry_id] = coordinators
+
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        # Give back the pooled client and the fleet slots, so a retry does
+        # not stack another reference on a connection that never closes
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        for coordinator in coordinators.values():
+            await coordinator.async_shutdown()
+        fleet.async_drop_if_empty()
+        await pool.async_release(client)
+        raise
+
+    # Chargers that cannot be reached yet keep retrying on their poll
+    # interval; the task is cancelled if the entry is unloaded first
+    entry.async_create_background_task(
+        hass,
+        fleet.async_refresh_all(list(coordinators.values())),
+        f"evmeter first refresh {entry.entry_id}",
+    )
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        coordinator: EVMeterCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
-        await coordinator.async_shutdown()
+        coordinators: dict[str, EVMeterCoordinator] = hass.data[DOMAIN].pop(
+            entry.entry_id
+        )
+        for coordinator in coordinators.values():
+            await coordinator.async_shutdown()
+        client = next(iter(coordinators.values())).client
+        await get_connection_pool(hass).async_release(client)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved frames of a removed config entry."""
+    await EVMeterSnapshotStore(hass, entry.entry_id).async_remove()
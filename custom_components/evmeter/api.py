@@ -0,0 +1,781 @@
+"""Integration-side extensions to the EV-Meter client."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import string
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import Enum, StrEnum
+from typing import Any, TypeVar
+
+import aiomqtt
+from evmeter_client import EVMeterClient, EVMeterConfig
+from evmeter_client.exceptions import (
+    EVMeterError,
+    EVMeterProtocolError,
+    EVMeterTimeoutError,
+)
+from evmeter_client.models import (
+    ChargerMetrics,
+    ChargerState,
+    ChargerStatus,
+    ChargingState,
+    EVStatus,
+    GridType,
+    MQTTType,
+    PhaseType,
+)
+
+from .const import (
+    CHARGER_ID_HEX_DIGITS,
+    DEFAULT_MIN_REQUEST_TIMEOUT,
+    FRAME_KEY_CONFIRMATIONS,
+    RECONNECT_BACKOFF_MAX,
+    RECONNECT_BACKOFF_MIN,
+    RECONNECT_FAILED_ATTEMPTS,
+)
+from .decoder import WORKING_INFO_TYPE, decode_response
+from .frames import FrameLog
+from .timing import RttEstimator, StageTimings
+
+_LOGGER = logging.getLogger(__name__)
+
+_EnumT = TypeVar("_EnumT", bound=Enum)
+
+# Charger status byte at offset 1 of the inner payload (PROTOCOL.md 4.3)
+_STATE_MAP = {
+    0: ChargerState.NOT_CONNECTED,
+    1: ChargerState.WANTS_TO_CHARGE,
+    2: ChargerState.CONNECTED,
+}
+
+
+class ConnectionState(StrEnum):
+    """State of the shared MQTT connection."""
+
+    DISCONNECTED = "disconnected"
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    BACKOFF = "backoff"
+    FAILED = "failed"
+
+
+@dataclass
+class ChargerSnapshot:
+    """Status and metrics decoded from a single WorkingInfo frame."""
+
+    status: ChargerStatus
+    metrics: ChargerMetrics
+    # Seconds spent in each request stage of the round trip, when timed
+    timings: dict[str, float] = field(default_factory=dict)
+    # Raw frame the snapshot was decoded from, when received live
+    frame: bytes | None = None
+
+
+def _backoff_delay(failures: int) -> float:
+    """Return an exponential reconnect delay with jitter."""
+    delay = min(RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_MIN * 2.0 ** (failures - 1))
+    # Spread reconnects so clients that dropped together do not retry together
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _enum_member(enum_cls: type[_EnumT], name: Any, default: _EnumT) -> _EnumT:
+    """Map a parser enum name (e.g. "CHARGING_1_PHASE") onto a model enum."""
+    return enum_cls.__members__.get(name, default)
+
+
+def response_charger_id(response: dict[str, Any]) -> str | None:
+    """Return the Charger ID field of a parsed WorkingInfo response."""
+    charger_id = response.get("working_info", {}).get("id")
+    return None if charger_id is None else str(charger_id)
+
+
+def correlation_key(charger_id: str) -> str | None:
+    """Return the Charger ID field a configured charger ID is expected to map to.
+
+    Charger IDs are 12 hex digits (e.g. ``7C9EBD4757CE``), taken to be the
+    Charger ID field of a WorkingInfo frame (PROTOCOL.md 4.2) written in hex.
+    Other ID formats cannot be mapped up front; the client learns their field
+    from their answers, and relearns the field of a charger whose requests
+    keep going unanswered.
+    """
+    charger_id = charger_id.strip()
+    if len(charger_id) != CHARGER_ID_HEX_DIGITS or not all(
+        char in string.hexdigits for char in charger_id
+    ):
+        return None
+    return str(int(charger_id, 16))
+
+
+def status_from_response(charger_id: str, response: dict[str, Any]) -> ChargerStatus:
+    """Build a ChargerStatus from a parsed BLEWIFI response."""
+    try:
+        working_info = response.get("working_info", {})
+        return ChargerStatus(
+            charger_id=charger_id,
+            state=_STATE_MAP.get(response.get("status", 0), ChargerState.NOT_CONNECTED),
+            evse=working_info.get("evse", 0),
+            kubis_version=working_info.get("kubisVersion", ""),
+            ev_status=_enum_member(
+                EVStatus, working_info.get("evStatus"), EVStatus.UNKNOWN
+            ),
+            charging_state=_enum_member(
+                ChargingState,
+                working_info.get("chargingState"),
+                ChargingState.UNKNOWN,
+            ),
+            warnings=working_info.get("warnings", 0),
+            errors=working_info.get("errors", 0),
+            phase_type=_enum_member(
+                PhaseType, working_info.get("phase_type"), PhaseType.UNKNOWN
+            ),
+            grid_type=_enum_member(
+                GridType, working_info.get("grid_type"), GridType.UNKNOWN
+            ),
+            wifi_network=working_info.get("wifi", ""),
+            mqtt_type=_enum_member(
+                MQTTType, working_info.get("mqtt_type"), MQTTType.UNKNOWN
+            ),
+            firmware_version=working_info.get("firmwareVersion", 0),
+            set_current=working_info.get("setCurrent", 0),
+            limit=working_info.get("limit", 0),
+            start_time=working_info.get("startTime", 0),
+            scheduler_version=working_info.get("schedulerVersion", 0),
+            circuit_breaker=working_info.get("circuitBreak", 0),
+            temperature=working_info.get("temperature", 0),
+        )
+    except (AttributeError, KeyError, TypeError) as err:
+        raise EVMeterProtocolError(
+            f"Invalid status response payload: {response}"
+        ) from err
+
+
+def metrics_from_response(charger_id: str, response: dict[str, Any]) -> ChargerMetrics:
+    """Build a ChargerMetrics from a parsed BLEWIFI response."""
+    try:
+        working_info = response.get("working_info", {})
+
+        voltage_ph1 = working_info.get("voltagePh1", 0.0)
+        voltage_ph2 = working_info.get("voltagePh2", 0.0)
+        voltage_ph3 = working_info.get("voltagePh3", 0.0)
+        current_ph1 = working_info.get("currentPh1", 0.0)
+        current_ph2 = working_info.get("currentPh2", 0.0)
+        current_ph3 = working_info.get("currentPh3", 0.0)
+        session_energy_wh = working_info.get("session", 0)
+        total_energy_wh = working_info.get("total", 0)
+
+        return ChargerMetrics(
+            charger_id=charger_id,
+            voltage_ph1=voltage_ph1,
+            voltage_ph2=voltage_ph2,
+            voltage_ph3=voltage_ph3,
+            current_ph1=current_ph1,
+            current_ph2=current_ph2,
+            current_ph3=current_ph3,
+            dlm_current_ph1=working_info.get("dlmCurrentPh1", 0.0),
+            dlm_current_ph2=working_info.get("dlmCurrentPh2", 0.0),
+            dlm_current_ph3=working_info.get("dlmCurrentPh3", 0.0),
+            session_energy_wh=session_energy_wh,
+            total_energy_wh=total_energy_wh,
+            # Total power from all 3 phases (V * I), in kW
+            power_kw=(
+                voltage_ph1 * current_ph1
+                + voltage_ph2 * current_ph2
+                + voltage_ph3 * current_ph3
+            )
+            / 1000.0,
+            session_energy_kwh=session_energy_wh / 1000.0,
+            total_energy_kwh=total_energy_wh / 1000.0,
+            voltage_avg=(voltage_ph1 + voltage_ph2 + voltage_ph3) / 3.0,
+            current_avg=(current_ph1 + current_ph2 + current_ph3) / 3.0,
+            temperature=working_info.get("temperature", 0),
+            peer_serial_number=working_info.get("peerSerialNumber", 0),
+            avg_ping_latency=working_info.get("avgPingLatency", 0),
+        )
+    except (AttributeError, KeyError, TypeError) as err:
+        raise EVMeterProtocolError(
+            f"Invalid metrics response payload: {response}"
+        ) from err
+
+
+def snapshot_from_response(
+    charger_id: str, response: dict[str, Any]
+) -> ChargerSnapshot:
+    """Build both status and metrics from one parsed BLEWIFI response."""
+    return ChargerSnapshot(
+        status=status_from_response(charger_id, response),
+        metrics=metrics_from_response(charger_id, response),
+        timings=response.get("timings", {}),
+        frame=response.get("frame"),
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _Command:
+    """A charger's encoded command and where its response is filed."""
+
+    topic: str
+    payload: bytes
+
+
+class EVMeterApiClient(EVMeterClient):
+    """EV-Meter client with the fetch paths used by the integration."""
+
+    _client: aiomqtt.Client | None
+
+    def __init__(self, config: EVMeterConfig) -> None:
+        """Initialize the client."""
+        super().__init__(config)
+        # Listener for each charger's unsolicited frames, reached by the frame's
+        # Charger ID field through _chargers_by_key
+        self._frame_listeners: dict[str, Callable[[dict[str, Any]], None]] = {}
+        # Requests waiting for a response, keyed by charger ID, oldest first
+        self._pending_requests: dict[str, list[asyncio.Future[dict[str, Any]]]] = {}
+        # Charger ID field each charger reports, mapped or learned, both ways
+        self._frame_keys: dict[str, str] = {}
+        self._chargers_by_key: dict[str, str] = {}
+        # Chargers whose ID was already tried as their field
+        self._claimed: set[str] = set()
+        # Held by requests for chargers whose field is not known, so at most
+        # one of them waits and an unclaimed frame can be taken as its answer
+        self._learning = asyncio.Lock()
+        self._learning_charger: str | None = None
+        # Unclaimed field that answered each learning charger, and how many of
+        # its requests in a row it answered
+        self._key_candidates: dict[str, tuple[str, int]] = {}
+        # Unclaimed fields that arrived while each charger's request waited,
+        # and the timed out requests in a row during which some did
+        self._unclaimed_seen: dict[str, set[str]] = {}
+        self._unanswered: dict[str, int] = {}
+        # Commands only depend on the charger and user, so each is built once
+        self._commands: dict[tuple[str, str], _Command] = {}
+        # Round trip in flight per charger, joined by concurrent callers
+        self._in_flight: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        # Monotonic time the frame answering each resolved request arrived
+        self._arrivals: dict[asyncio.Future[dict[str, Any]], float] = {}
+        # Connect and subscribe durations; request stages travel with each
+        # response instead, so they can be told apart per charger
+        self.timings = StageTimings()
+        # Round trip time estimates that set each charger's request timeout
+        self._rtt: dict[str, RttEstimator] = {}
+        # Latest raw frames with their wall clock receive times, for diagnostics
+        self.frames = FrameLog()
+        self._message_task: asyncio.Task[None] | None = None
+
+        # Connection state machine, run by the supervisor task
+        self.connection_state = ConnectionState.DISCONNECTED
+        self.reconnects = 0
+        self._connected = asyncio.Event()
+        self._connection_lost = asyncio.Event()
+        self._supervisor: asyncio.Task[None] | None = None
+
+    def async_start(self) -> None:
+        """Start keeping the connection up, if not already started."""
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.get_running_loop().create_task(
+                self._supervise(), name=f"evmeter-{self.config.user_id}-connection"
+            )
+
+    async def async_stop(self) -> None:
+        """Stop the supervisor and disconnect."""
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except asyncio.CancelledError:
+                pass
+            self._supervisor = None
+        await self._async_close()
+        self._set_state(ConnectionState.DISCONNECTED)
+
+    async def async_wait_connected(self, timeout: float) -> None:
+        """Wait until the connection is up.
+
+        Returns at once while connected. Fails fast while backing off, so polls
+        do not pile up behind a connection that is known to be down.
+        """
+        if self._connected.is_set():
+            return
+        self.async_start()
+        if self.connection_state in (ConnectionState.BACKOFF, ConnectionState.FAILED):
+            raise EVMeterError(f"MQTT connection is {self.connection_state}")
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError as err:
+            raise EVMeterError("Timed out waiting for MQTT connection") from err
+
+    def _set_state(self, state: ConnectionState) -> None:
+        """Move the connection state machine to a new state."""
+        if state is not self.connection_state:
+            _LOGGER.debug(
+                "MQTT connection for %s: %s -> %s",
+                self.config.mqtt_host,
+                self.connection_state,
+                state,
+            )
+            self.connection_state = state
+        if state is ConnectionState.CONNECTED:
+            self._connected.set()
+        else:
+            self._connected.clear()
+
+    async def _supervise(self) -> None:
+        """Connect, then reconnect with backoff whenever the connection drops."""
+        failures = 0
+        while True:
+            self._set_state(ConnectionState.RECONNECTING)
+            self._connection_lost.clear()
+            try:
+                await self.connect()
+            except EVMeterError as err:
+                failures += 1
+                delay = _backoff_delay(failures)
+                _LOGGER.warning(
+                    "MQTT connection attempt %s failed (%s), retrying in %.1fs",
+                    failures,
+                    err,
+                    delay,
+                )
+                self._set_state(
+                    ConnectionState.FAILED
+                    if failures >= RECONNECT_FAILED_ATTEMPTS
+                    else ConnectionState.BACKOFF
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            failures = 0
+            self._set_state(ConnectionState.CONNECTED)
+            await self._connection_lost.wait()
+
+            _LOGGER.warning("MQTT connection lost, reconnecting")
+            self.reconnects += 1
+            self._set_state(ConnectionState.RECONNECTING)
+            await self._async_close()
+
+    async def connect(self) -> None:
+        """Connect to the broker and subscribe to the user topic, timing both."""
+        if self._client:
+            return
+
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self._test_connectivity):
+            raise EVMeterError(
+                f"Cannot reach MQTT broker at {self.config.mqtt_host}:"
+                f"{self.config.mqtt_port}"
+            )
+
+        client = aiomqtt.Client(
+            hostname=self.config.mqtt_host,
+            port=self.config.mqtt_port,
+            username=self.config.mqtt_username,
+            password=self.config.mqtt_password,
+        )
+        start = time.monotonic()
+        try:
+            await client.__aenter__()
+        except Exception as err:
+            raise EVMeterError(f"MQTT connection failed: {err}") from err
+        connected = time.monotonic()
+        self.timings.record("connect", connected - start)
+
+        response_topic = self.config.response_topic_template.format(
+            user_id=self.config.user_id
+        )
+        try:
+            await client.subscribe(response_topic, qos=self.config.qos)
+        except Exception as err:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception:  # pylint: disable=broad-except
+                pass
+            raise EVMeterError(f"MQTT subscribe failed: {err}") from err
+        self.timings.record("subscribe", time.monotonic() - connected)
+
+        self._client = client
+        self._message_task = loop.create_task(self._message_handler())
+
+    async def _async_close(self) -> None:
+        """Tear down the MQTT client and fail requests waiting on it."""
+        for futures in self._pending_requests.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(EVMeterError("MQTT connection lost"))
+        self._pending_requests.clear()
+        if (task := self._message_task) is not None:
+            # Stop the old connection's handler before its client goes away
+            self._message_task = None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.disconnect()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Error closing MQTT client: %s", err)
+        self._client = None
+
+    def add_frame_listener(
+        self, charger_id: str, listener: Callable[[dict[str, Any]], None]
+    ) -> Callable[[], None]:
+        """Listen for a charger's WorkingInfo frames that no request asked for.
+
+        Each frame is handed only to the listener of the charger its Charger
+        ID field names, so one frame costs one call however many chargers
+        share the client. Returns a callable that removes the listener.
+        """
+        self._claim(charger_id)
+        self._frame_listeners[charger_id] = listener
+
+        def remove_listener() -> None:
+            if self._frame_listeners.get(charger_id) is listener:
+                del self._frame_listeners[charger_id]
+
+        return remove_listener
+
+    async def _message_handler(self) -> None:
+        """Decode each message on the user topic once and dispatch it.
+
+        The message iterator raises when the broker connection drops, which
+        is what drives the supervisor into reconnecting.
+        """
+        if not (client := self._client):
+            return
+        try:
+            async for message in client.messages:
+                if isinstance(message.payload, (bytes, bytearray)):
+                    self._handle_payload(bytes(message.payload))
+        except aiomqtt.MqttError as err:
+            _LOGGER.debug("MQTT message loop ended: %s", err)
+        finally:
+            if self._client is client:
+                self._connection_lost.set()
+
+    def _handle_payload(self, payload: bytes) -> None:
+        """Resolve pending requests with a response, or push it to its listener."""
+        self.frames.append(time.time(), payload)
+        received = time.monotonic()
+        response = decode_response(payload)
+        response["timings"] = {"decode": time.monotonic() - received}
+        response["frame"] = payload
+
+        if futures := self._pop_pending(response):
+            for future in futures:
+                if not future.done():
+                    self._arrivals[future] = received
+                    future.set_result(response)
+            return
+
+        if response.get("type") != WORKING_INFO_TYPE:
+            _LOGGER.debug(
+                "Dropping response of type %s that answers no request",
+                response.get("type"),
+            )
+            return
+        if (frame_key := response_charger_id(response)) is None:
+            return
+        if (charger_id := self._chargers_by_key.get(frame_key)) is None:
+            self._note_unclaimed(frame_key)
+            return
+        if (listener := self._frame_listeners.get(charger_id)) is None:
+            return
+        try:
+            listener(response)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in EV-Meter frame listener")
+
+    def _pop_pending(
+        self, response: dict[str, Any]
+    ) -> list[asyncio.Future[dict[str, Any]]] | None:
+        """Take the pending requests a response answers.
+
+        All responses arrive on the same user topic. A frame answers the
+        requests for the charger named in its Charger ID field. A frame whose
+        field no charger claims may answer the one request of a charger whose
+        field is being learned.
+        """
+        frame_key = response_charger_id(response)
+        if frame_key is None:
+            return None
+        if (charger_id := self._chargers_by_key.get(frame_key)) is None:
+            return self._answer_learning(frame_key)
+        return self._pending_requests.pop(charger_id, None)
+
+    def _answer_learning(
+        self, frame_key: str
+    ) -> list[asyncio.Future[dict[str, Any]]] | None:
+        """Answer the learning charger's request with an unclaimed frame.
+
+        Another charger of the user may push at the same moment, so one
+        answer proves nothing. The field is only mapped once it answered
+        ``FRAME_KEY_CONFIRMATIONS`` requests of the charger in a row. Until
+        then the charger only takes frames with the field that answered it
+        first; if its request goes unanswered, it starts over.
+        """
+        charger_id = self._learning_charger
+        if charger_id is None or charger_id not in self._pending_requests:
+            return None
+        candidate, count = self._key_candidates.get(charger_id, (frame_key, 0))
+        if candidate != frame_key or any(
+            other != charger_id and other_candidate == frame_key
+            for other, (other_candidate, _) in self._key_candidates.items()
+        ):
+            return None
+        if count + 1 < FRAME_KEY_CONFIRMATIONS:
+            self._key_candidates[charger_id] = (frame_key, count + 1)
+        else:
+            del self._key_candidates[charger_id]
+            _LOGGER.info(
+                "Charger %s answered as Charger ID %s %s times in a row; "
+                "matching it by that field from now on",
+                charger_id,
+                frame_key,
+                FRAME_KEY_CONFIRMATIONS,
+            )
+            self._map_frame_key(charger_id, frame_key)
+        return self._pending_requests.pop(charger_id)
+
+    def _note_unclaimed(self, frame_key: str) -> None:
+        """Record a frame whose Charger ID field no charger claims."""
+        for seen in self._unclaimed_seen.values():
+            seen.add(frame_key)
+        # A field that also arrives while a charger is not being asked comes
+        # from another charger pushing on its own
+        for charger_id, (candidate, _) in list(self._key_candidates.items()):
+            if candidate == frame_key and charger_id not in self._pending_requests:
+                del self._key_candidates[charger_id]
+
+    def _count_unanswered(self, charger_id: str, seen: set[str]) -> None:
+        """Count a timed out request, relearning a field that stopped matching.
+
+        A mapped charger that goes unanswered ``FRAME_KEY_CONFIRMATIONS``
+        times in a row while unclaimed frames arrive may carry another field
+        than its ID was taken for, so its field is learned again.
+        """
+        self._key_candidates.pop(charger_id, None)
+        if (frame_key := self._frame_keys.get(charger_id)) is None:
+            return
+        if not seen - self._chargers_by_key.keys():
+            # Nothing else arrived either, so the charger is just offline
+            self._unanswered.pop(charger_id, None)
+            return
+        count = self._unanswered.get(charger_id, 0) + 1
+        if count < FRAME_KEY_CONFIRMATIONS:
+            self._unanswered[charger_id] = count
+            return
+        del self._unanswered[charger_id]
+        _LOGGER.info(
+            "Charger %s did not answer as Charger ID %s %s times in a row while "
+            "other frames arrived; learning its field again",
+            charger_id,
+            frame_key,
+            FRAME_KEY_CONFIRMATIONS,
+        )
+        del self._frame_keys[charger_id]
+        if self._chargers_by_key.get(frame_key) == charger_id:
+            del self._chargers_by_key[frame_key]
+
+    def _claim(self, charger_id: str) -> None:
+        """Map a charger to the field its ID stands for, the first time only."""
+        if charger_id in self._claimed:
+            return
+        self._claimed.add(charger_id)
+        if charger_id not in self._frame_keys and (
+            frame_key := correlation_key(charger_id)
+        ):
+            self._map_frame_key(charger_id, frame_key)
+
+    def _map_frame_key(self, charger_id: str, frame_key: str) -> None:
+        """Remember the Charger ID field a charger's frames carry."""
+        if (old_key := self._frame_keys.get(charger_id)) is not None:
+            if self._chargers_by_key.get(old_key) == charger_id:
+                del self._chargers_by_key[old_key]
+        self._frame_keys[charger_id] = frame_key
+        self._chargers_by_key[frame_key] = charger_id
+
+    def frame_key(self, charger_id: str) -> str | None:
+        """Return the Charger ID field of a charger's frames, if known."""
+        self._claim(charger_id)
+        return self._frame_keys.get(charger_id)
+
+    def rtt_estimator(self, charger_id: str) -> RttEstimator:
+        """Return a charger's round trip time estimate, creating it if needed.
+
+        Until bounds are set, timeouts stay within the configured response
+        timeout.
+        """
+        if (estimator := self._rtt.get(charger_id)) is None:
+            max_timeout = self.config.response_timeout
+            estimator = self._rtt[charger_id] = RttEstimator(
+                min(DEFAULT_MIN_REQUEST_TIMEOUT, max_timeout), max_timeout
+            )
+        return estimator
+
+    def set_timeout_bounds(
+        self, charger_id: str, min_timeout: float, max_timeout: float
+    ) -> None:
+        """Set the range a charger's adaptive request timeout stays within."""
+        estimator = self.rtt_estimator(charger_id)
+        estimator.min_timeout = min_timeout
+        estimator.max_timeout = max_timeout
+
+    def _command(self, charger_id: str) -> _Command:
+        """Return the charger's command, building it on first use."""
+        cache_key = (charger_id, self.config.user_id)
+        if (command := self._commands.get(cache_key)) is None:
+            command = self._commands[cache_key] = _Command(
+                self.config.command_topic_template.format(charger_id=charger_id),
+                super()._create_command_payload(charger_id),
+            )
+            self._claim(charger_id)
+        return command
+
+    def _create_command_payload(self, charger_id: str) -> bytes:
+        """Return the cached command payload for a charger."""
+        return self._command(charger_id).payload
+
+    async def _send_command(
+        self, charger_id: str, command_payload: bytes, timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Publish a command and wait for the already-decoded response.
+
+        Concurrent callers for the same charger share one round trip: only
+        the first publishes, the others wait for its response. A round trip
+        started with an explicit timeout waits only that long.
+        """
+        request = self._in_flight.get(charger_id)
+        if request is None or request.done():
+            request = asyncio.get_running_loop().create_task(
+                self._request(charger_id, command_payload, timeout)
+            )
+            self._in_flight[charger_id] = request
+            request.add_done_callback(lambda task: self._request_done(charger_id, task))
+        else:
+            _LOGGER.debug("Joining in-flight request for charger %s", charger_id)
+        # A caller giving up must not cancel the request for the others
+        return await asyncio.shield(request)
+
+    def _request_done(self, charger_id: str, request: asyncio.Task) -> None:
+        """Forget a finished round trip."""
+        if self._in_flight.get(charger_id) is request:
+            del self._in_flight[charger_id]
+        if not request.cancelled():
+            # Retrieved here so a request every caller abandoned is not logged
+            request.exception()
+
+    async def _request(
+        self, charger_id: str, command_payload: bytes, timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Publish one command and wait for its response.
+
+        Requests for different chargers can be in flight at the same time;
+        each resolves only with its own charger's frame. Requests for chargers
+        whose field is not known take turns, so an unclaimed frame can be
+        taken as the answer of the one waiting; the wait for a turn counts
+        against the timeout. The timeout follows the charger's measured round
+        trip time, unless one is given. A request with its own timeout, like a
+        setup probe, does not back off the charger's timeout when it goes
+        unanswered.
+        """
+        command = self._command(charger_id)
+        back_off = timeout is None
+        if timeout is None:
+            timeout = self.rtt_estimator(charger_id).timeout
+        if self.frame_key(charger_id) is not None:
+            return await self._round_trip(
+                charger_id, command.topic, command_payload, timeout, back_off
+            )
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._learning.acquire(), timeout)
+        except asyncio.TimeoutError as err:
+            raise EVMeterTimeoutError(
+                f"Timeout waiting to ask charger {charger_id}, whose answers "
+                "are still being learned"
+            ) from err
+        self._learning_charger = charger_id
+        try:
+            return await self._round_trip(
+                charger_id,
+                command.topic,
+                command_payload,
+                max(0.0, timeout - (time.monotonic() - start)),
+                back_off,
+            )
+        finally:
+            self._learning_charger = None
+            self._learning.release()
+
+    async def _round_trip(
+        self,
+        charger_id: str,
+        topic: str,
+        command_payload: bytes,
+        timeout: float,
+        back_off: bool,
+    ) -> dict[str, Any]:
+        """Publish a charger's command and wait for the frame answering it."""
+        if not self._client:
+            raise EVMeterError("Not connected to MQTT broker")
+
+        future: asyncio.Future[dict[str, Any]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        estimator = self.rtt_estimator(charger_id)
+        self._pending_requests.setdefault(charger_id, []).append(future)
+        seen: set[str] = set()
+        self._unclaimed_seen[charger_id] = seen
+        try:
+            start = time.monotonic()
+            await self._client.publish(
+                topic, payload=command_payload, qos=self.config.qos
+            )
+            published = time.monotonic()
+            response = await asyncio.wait_for(future, timeout=timeout)
+            arrived = self._arrivals[future]
+            estimator.sample(arrived - start)
+            self._unanswered.pop(charger_id, None)
+            response["timings"]["publish"] = published - start
+            response["timings"]["first_byte"] = arrived - published
+            return response
+        except asyncio.TimeoutError as err:
+            if back_off:
+                estimator.timed_out()
+            self._count_unanswered(charger_id, seen)
+            raise EVMeterTimeoutError(
+                f"Timeout waiting for response for charger {charger_id}"
+            ) from err
+        except EVMeterError:
+            raise
+        except Exception as err:
+            raise EVMeterError(f"Failed to send command: {err}") from err
+        finally:
+            self._arrivals.pop(future, None)
+            if self._unclaimed_seen.get(charger_id) is seen:
+                del self._unclaimed_seen[charger_id]
+            waiting = self._pending_requests.get(charger_id)
+            if waiting and future in waiting:
+                waiting.remove(future)
+                if not waiting:
+                    del self._pending_requests[charger_id]
+
+    async def get_charger_snapshot(
+        self, charger_id: str, timeout: float | None = None
+    ) -> ChargerSnapshot:
+        """Get status and metrics from a single command round trip.
+
+        ``get_charger_status`` and ``get_charger_metrics`` each publish a
+        command and decode the same WorkingInfo frame, so calling both costs
+        two round trips. This publishes once and builds both models from the
+        one response.
+        """
+        command_payload = self._create_command_payload(charger_id)
+        response = await self._send_command(charger_id, command_payload, timeout)
+        _LOGGER.debug("Snapshot response for %s: %s", charger_id, response)
+        return snapshot_from_response(charger_id, response)
@@ -0,0 +1,62 @@
+"""Circuit breaker for chargers that stop answering."""
+
+from __future__ import annotations
+
+from enum import StrEnum
+from typing import Any
+
+from .const import BREAKER_PROBE_MAX, BREAKER_PROBE_MIN, BREAKER_TIMEOUTS
+
+
+class BreakerState(StrEnum):
+    """Whether a charger is polled normally or only probed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+
+class CircuitBreaker:
+    """Stop polling a charger that keeps timing out.
+
+    After ``BREAKER_TIMEOUTS`` timeouts in a row the breaker opens, and the
+    charger is only probed, at intervals that double from
+    ``BREAKER_PROBE_MIN`` up to ``BREAKER_PROBE_MAX``. Any frame from the
+    charger, answered or pushed, closes it again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed breaker."""
+        self.state = BreakerState.CLOSED
+        self.consecutive_timeouts = 0
+        self.probe_interval: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether the charger is only being probed."""
+        return self.state is BreakerState.OPEN
+
+    def record_timeout(self) -> bool:
+        """Count a request that timed out; return True if the breaker opened."""
+        self.consecutive_timeouts += 1
+        if self.is_open:
+            self.probe_interval = min(
+                BREAKER_PROBE_MAX, (self.probe_interval or BREAKER_PROBE_MIN) * 2
+            )
+            return False
+        if self.consecutive_timeouts < BREAKER_TIMEOUTS:
+            return False
+        self.state = BreakerState.OPEN
+        self.probe_interval = BREAKER_PROBE_MIN
+        return True
+
+    def record_frame(self) -> bool:
+        """Reset on a frame from the charger; return True if the breaker closed."""
+        was_open = self.is_open
+        self.state = BreakerState.CLOSED
+        self.consecutive_timeouts = 0
+        self.probe_interval = None
+        return was_open
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state shown as entity attributes."""
+        return {"request_breaker": self.state, "probe_interval": self.probe_interval}
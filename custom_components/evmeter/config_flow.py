@@ -2,19 +2,85 @@
 
 from __future__ import annotations
 
+import asyncio
+import csv
+import io
 import logging
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
-from evmeter_client import EVMeterClient, EVMeterConfig
+from evmeter_client import EVMeterConfig
 from evmeter_client.exceptions import EVMeterError, EVMeterTimeoutError
 
-from .const import DOMAIN
+from . import entry_charger_ids
+from .api import EVMeterApiClient, correlation_key
+from .const import (
+    CONF_CHARGER_IDS,
+    CONF_CHARGING_SCAN_INTERVAL,
+    CONF_CURRENT_DEADBAND,
+    CONF_MAX_REQUEST_TIMEOUT,
+    CONF_MAX_SILENCE,
+    CONF_MIN_REQUEST_TIMEOUT,
+    CONF_POWER_DEADBAND,
+    CONF_SCAN_INTERVAL,
+    CONF_STALE_GRACE,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_UNPLUGGED_SCAN_INTERVAL,
+    CONF_VOLTAGE_DEADBAND,
+    CONF_WAITING_SCAN_INTERVAL,
+    DEFAULT_CHARGING_SCAN_INTERVAL,
+    DEFAULT_CURRENT_DEADBAND,
+    DEFAULT_MAX_REQUEST_TIMEOUT,
+    DEFAULT_MAX_SILENCE,
+    DEFAULT_MIN_REQUEST_TIMEOUT,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_GRACE,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_UNPLUGGED_SCAN_INTERVAL,
+    DEFAULT_VOLTAGE_DEADBAND,
+    DEFAULT_WAITING_SCAN_INTERVAL,
+    DOMAIN,
+    FLEET_VALIDATION_CONCURRENCY,
+    VALIDATION_CONNECT_TIMEOUT,
+    VALIDATION_LINGER,
+    VALIDATION_PROBE_TIMEOUT,
+)
+from .pool import get_connection_pool
+
+_INTERVAL = vol.All(vol.Coerce(int), vol.Range(min=5, max=3600))
+_DEADBAND = vol.All(vol.Coerce(float), vol.Range(min=0))
+_TIMEOUT = vol.All(vol.Coerce(float), vol.Range(min=0.5, max=60))
+
+# Options as (key, default, validator)
+OPTIONS: tuple[tuple[str, Any, Any], ...] = (
+    (CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, _INTERVAL),
+    (CONF_CHARGING_SCAN_INTERVAL, DEFAULT_CHARGING_SCAN_INTERVAL, _INTERVAL),
+    (CONF_WAITING_SCAN_INTERVAL, DEFAULT_WAITING_SCAN_INTERVAL, _INTERVAL),
+    (CONF_UNPLUGGED_SCAN_INTERVAL, DEFAULT_UNPLUGGED_SCAN_INTERVAL, _INTERVAL),
+    (CONF_VOLTAGE_DEADBAND, DEFAULT_VOLTAGE_DEADBAND, _DEADBAND),
+    (CONF_CURRENT_DEADBAND, DEFAULT_CURRENT_DEADBAND, _DEADBAND),
+    (CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND, _DEADBAND),
+    (CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND, _DEADBAND),
+    (
+        CONF_MAX_SILENCE,
+        DEFAULT_MAX_SILENCE,
+        vol.All(vol.Coerce(int), vol.Range(min=0)),
+    ),
+    (
+        CONF_STALE_GRACE,
+        DEFAULT_STALE_GRACE,
+        vol.All(vol.Coerce(int), vol.Range(min=0)),
+    ),
+    (CONF_MIN_REQUEST_TIMEOUT, DEFAULT_MIN_REQUEST_TIMEOUT, _TIMEOUT),
+    (CONF_MAX_REQUEST_TIMEOUT, DEFAULT_MAX_REQUEST_TIMEOUT, _TIMEOUT),
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,139 +92,313 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_FLEET_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required("user_id"): str,
+        vol.Required(CONF_CHARGER_IDS): TextSelector(
+            TextSelectorConfig(multiline=True)
+        ),
+    }
+)
 
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect.
 
-    Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+def parse_charger_ids(text: str) -> list[str]:
+    """Read charger IDs from a list or pasted CSV, in order and without repeats.
+
+    IDs may be separated by commas, semicolons or line breaks. For CSV with a
+    header row, the ``charger_id`` column is used; otherwise every cell is an
+    ID.
     """
-    _LOGGER.debug("Starting connection validation")
-    _LOGGER.debug(f"Charger ID: {data['charger_id']}")
-    _LOGGER.debug(f"User ID: {data['user_id']}")
+    rows = [
+        [cell.strip() for cell in row]
+        for row in csv.reader(io.StringIO(text.replace(";", ",")))
+    ]
+    rows = [row for row in rows if any(row)]
+    header = [cell.lower() for cell in rows[0]] if rows else []
+    if "charger_id" in header:
+        column = header.index("charger_id")
+        cells = [row[column] for row in rows[1:] if len(row) > column]
+    else:
+        cells = [cell for row in rows for cell in row]
+    return list(dict.fromkeys(cell for cell in cells if cell))
 
-    # Create client with hardcoded MQTT settings per PRD
-    config = EVMeterConfig(
-        user_id=data["user_id"],
-    )
 
-    _LOGGER.debug(f"MQTT Config - Host: {config.mqtt_host}:{config.mqtt_port}")
-    _LOGGER.debug(f"MQTT Config - Username: {config.mqtt_username}")
-    _LOGGER.debug(
-        f"MQTT Config - Response topic: {config.response_topic_template.format(user_id=data['user_id'])}"
-    )
+def valid_charger_id(charger_id: str) -> bool:
+    """Return whether a charger ID can be polled.
+
+    The ID is one level of the command topic ``/BLEWIFI/Chargers/{charger_id}``,
+    so it is made of ASCII letters and digits, like ``7C9EBD4757CE``.
+    """
+    return charger_id.isascii() and charger_id.isalnum()
 
-    client = EVMeterClient(config)
 
+async def _async_connect(hass: HomeAssistant, user_id: str) -> EVMeterApiClient:
+    """Borrow the pooled client for a user ID and wait for it to connect."""
+    # Per PRD: MQTT settings are hardcoded, only the user ID is configurable
+    pool = get_connection_pool(hass)
+    client: EVMeterApiClient = pool.acquire(EVMeterConfig(user_id=user_id))
     try:
-        _LOGGER.debug("Attempting MQTT connection...")
-        # Test connection and command
-        await client.connect()
-        _LOGGER.debug("MQTT connection successful")
+        await client.async_wait_connected(VALIDATION_CONNECT_TIMEOUT)
+    except EVMeterError as err:
+        _LOGGER.error("MQTT connection failed during validation: %s", err)
+        await pool.async_release(client)
+        raise ConnectionError(str(err)) from err
+    return client
 
-        _LOGGER.debug(
-            f"Testing charger status request for charger {data['charger_id']}"
-        )
-        # Test that we can get status from the charger
-        status = await client.get_charger_status(data["charger_id"])
-        _LOGGER.debug(f"Charger status response received: {status}")
 
-        await client.disconnect()
-        _LOGGER.debug("MQTT disconnection successful")
+async def _async_probe(client: EVMeterApiClient, charger_id: str) -> bool:
+    """Ask a charger for its status and return whether it answered.
 
-    except EVMeterTimeoutError as e:
-        _LOGGER.warning(f"Timeout during charger status request: {e}")
+    The connection is what is being validated; a charger that does not answer
+    quickly may just be offline, which is a runtime issue.
+    """
+    if correlation_key(charger_id) is None:
+        _LOGGER.warning(
+            "Charger ID %s is not 12 hex digits like the documented format; "
+            "its answers are matched once it has answered a few polls",
+            charger_id,
+        )
+    try:
+        # The probe's own timeout, so an unanswered probe neither keeps waiting
+        # nor backs off the charger's timeout for the polls after setup
+        snapshot = await client.get_charger_snapshot(
+            charger_id, timeout=VALIDATION_PROBE_TIMEOUT
+        )
+    except EVMeterTimeoutError:
         _LOGGER.warning(
-            "This could mean the charger ID is incorrect or the charger is offline"
+            "Charger %s did not answer within %ss; it may be offline or the "
+            "charger ID may be wrong, allowing setup to continue",
+            charger_id,
+            VALIDATION_PROBE_TIMEOUT,
         )
+        return False
+    except EVMeterError as err:
         _LOGGER.warning(
-            "However, MQTT connection was successful, so we'll allow the setup to continue"
+            "Error probing charger %s, allowing setup to continue: %s",
+            charger_id,
+            err,
         )
+        return False
+    _LOGGER.debug("Charger status response received: %s", snapshot.status)
+    return True
 
-        # For timeout errors, we still consider the setup successful since MQTT connection worked
-        # The charger might just be offline or the ID might be wrong, but that's a runtime issue
-        try:
-            await client.disconnect()
-        except Exception:
-            pass  # Ignore disconnect errors
-
-    except EVMeterError as e:
-        _LOGGER.error(f"EVMeterError during validation: {e}")
-        _LOGGER.error(f"Error type: {type(e).__name__}")
-        if hasattr(e, "__cause__") and e.__cause__:
-            _LOGGER.error(f"Underlying cause: {e.__cause__}")
-
-        # Check if this is a connection-related error vs. a timeout/charger error
-        if "connection" in str(e).lower() or "connect" in str(e).lower():
-            raise ConnectionError from e
-        else:
-            # Other EVMeter errors (like protocol errors) shouldn't block setup
-            _LOGGER.warning(
-                "Non-connection error during validation, allowing setup to continue"
-            )
-            try:
-                await client.disconnect()
-            except Exception:
-                pass
-
-    except Exception as e:
-        _LOGGER.error(f"Unexpected error during validation: {e}")
-        _LOGGER.error(f"Error type: {type(e).__name__}")
-
-        # Only treat actual connection/network errors as setup failures
-        if any(
-            keyword in str(e).lower()
-            for keyword in ["connection", "network", "dns", "resolve", "connect"]
-        ):
-            raise ConnectionError from e
-        else:
-            _LOGGER.warning(
-                "Non-connection error during validation, allowing setup to continue"
-            )
-            try:
-                await client.disconnect()
-            except Exception:
-                pass
+
+async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the user input allows us to connect.
+
+    Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+
+    Borrows the pooled connection for the user ID, so a site that is already
+    set up validates over its open connection. The connection is kept open
+    for a while afterwards for the entry that is about to be created.
+    """
+    _LOGGER.debug(
+        "Validating charger %s for user %s", data["charger_id"], data["user_id"]
+    )
+    client = await _async_connect(hass, data["user_id"])
+    try:
+        await _async_probe(client, data["charger_id"])
+    finally:
+        get_connection_pool(hass).release_later(hass, client, VALIDATION_LINGER)
 
     return {"title": f"EV-Meter Charger {data['charger_id']}"}
 
 
+async def validate_fleet_input(
+    hass: HomeAssistant, user_id: str, charger_ids: list[str]
+) -> dict[str, Any]:
+    """Validate the connection for a user and probe its chargers concurrently."""
+    _LOGGER.debug("Validating %s chargers for user %s", len(charger_ids), user_id)
+    client = await _async_connect(hass, user_id)
+    semaphore = asyncio.Semaphore(FLEET_VALIDATION_CONCURRENCY)
+
+    async def probe(charger_id: str) -> bool:
+        async with semaphore:
+            return await _async_probe(client, charger_id)
+
+    try:
+        answered = await asyncio.gather(*(probe(cid) for cid in charger_ids))
+    finally:
+        get_connection_pool(hass).release_later(hass, client, VALIDATION_LINGER)
+
+    _LOGGER.debug(
+        "%s of %s chargers answered during validation",
+        sum(answered),
+        len(charger_ids),
+    )
+    return {"title": _fleet_title(len(charger_ids))}
+
+
+def _fleet_title(chargers: int) -> str:
+    """Return the title of a fleet entry with this many chargers."""
+    return f"EV-Meter Fleet ({chargers} chargers)"
+
+
+def _connection_error(err: ConnectionError) -> str:
+    """Return the form error for a failed connection."""
+    # Try to categorize the error for better user feedback
+    error_msg = str(err).lower()
+    if "timeout" in error_msg or "timed out" in error_msg:
+        return "timeout"
+    if "name or service not known" in error_msg or "dns" in error_msg:
+        return "network_unreachable"
+    if "authentication" in error_msg or "auth" in error_msg:
+        return "auth_failed"
+    if "connection refused" in error_msg or "unreachable" in error_msg:
+        return "network_unreachable"
+    return "cannot_connect"
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for EV-Meter EV Charger."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["charger", "fleet"])
+
+    async def async_step_charger(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set up a single charger."""
         errors: dict[str, str] = {}
-        if user_input is not None:
+        if user_input is not None and not valid_charger_id(user_input["charger_id"]):
+            errors["charger_id"] = "invalid_charger_id"
+        elif user_input is not None:
             _LOGGER.debug(f"Processing user input: {user_input}")
             try:
                 info = await validate_input(self.hass, user_input)
                 _LOGGER.debug(f"Validation successful: {info}")
             except ConnectionError as e:
                 _LOGGER.error(f"Connection error during setup: {e}")
-                # Try to categorize the error for better user feedback
-                error_msg = str(e).lower()
-                if "timeout" in error_msg or "timed out" in error_msg:
-                    errors["base"] = "timeout"
-                elif "name or service not known" in error_msg or "dns" in error_msg:
-                    errors["base"] = "network_unreachable"
-                elif "authentication" in error_msg or "auth" in error_msg:
-                    errors["base"] = "auth_failed"
-                elif "connection refused" in error_msg or "unreachable" in error_msg:
-                    errors["base"] = "network_unreachable"
-                else:
-                    errors["base"] = "cannot_connect"
+                errors["base"] = _connection_error(e)
             except Exception as e:  # pylint: disable=broad-except
                 _LOGGER.exception(f"Unexpected exception during setup: {e}")
                 errors["base"] = "unknown"
             else:
                 await self.async_set_unique_id(user_input["charger_id"])
                 self._abort_if_unique_id_configured()
+                if user_input["charger_id"] in self._configured_charger_ids():
+                    return self.async_abort(reason="already_configured")
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="charger", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_fleet(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set up many chargers of one user as a single entry.
+
+        A later batch for the same user is added to its existing fleet entry.
+        """
+        errors: dict[str, str] = {}
+        placeholders = {"invalid_ids": ""}
+        if user_input is not None:
+            fleet_entry = await self.async_set_unique_id(
+                f"fleet_{user_input['user_id']}"
+            )
+            configured = self._configured_charger_ids()
+            parsed = parse_charger_ids(user_input[CONF_CHARGER_IDS])
+            invalid = [
+                charger_id for charger_id in parsed if not valid_charger_id(charger_id)
+            ]
+            charger_ids = [
+                charger_id for charger_id in parsed if charger_id not in configured
+            ]
+            if invalid:
+                errors[CONF_CHARGER_IDS] = "invalid_charger_ids"
+                placeholders["invalid_ids"] = ", ".join(invalid)
+            elif not charger_ids:
+                errors[CONF_CHARGER_IDS] = "no_new_chargers"
+            else:
+                try:
+                    info = await validate_fleet_input(
+                        self.hass, user_input["user_id"], charger_ids
+                    )
+                except ConnectionError as err:
+                    _LOGGER.error("Connection error during fleet setup: %s", err)
+                    errors["base"] = _connection_error(err)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Unexpected exception during fleet setup")
+                    errors["base"] = "unknown"
+                else:
+                    if fleet_entry is not None:
+                        charger_ids = entry_charger_ids(fleet_entry.data) + charger_ids
+                        # The entry's update listener reloads it with the new
+                        # chargers
+                        self.hass.config_entries.async_update_entry(
+                            fleet_entry,
+                            title=_fleet_title(len(charger_ids)),
+                            data={**fleet_entry.data, CONF_CHARGER_IDS: charger_ids},
+                        )
+                        return self.async_abort(reason="fleet_updated")
+                    return self.async_create_entry(
+                        title=info["title"],
+                        data={
+                            "user_id": user_input["user_id"],
+                            CONF_CHARGER_IDS: charger_ids,
+                        },
+                    )
+
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=STEP_FLEET_DATA_SCHEMA,
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    @callback
+    def _configured_charger_ids(self) -> set[str]:
+        """Return the chargers that existing entries already own."""
+        return {
+            charger_id
+            for entry in self._async_current_entries(include_ignore=False)
+            for charger_id in entry_charger_ids(entry.data)
+        }
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle EV-Meter options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage poll intervals and state-write deadbands."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input.get(
+                CONF_MIN_REQUEST_TIMEOUT, DEFAULT_MIN_REQUEST_TIMEOUT
+            ) > user_input.get(CONF_MAX_REQUEST_TIMEOUT, DEFAULT_MAX_REQUEST_TIMEOUT):
+                errors[CONF_MIN_REQUEST_TIMEOUT] = "min_timeout_above_max"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        # A rejected form is shown again with what was entered
+        options = user_input if user_input is not None else self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(key, default=options.get(key, default)): validator
+                    for key, default, validator in OPTIONS
+                }
+            ),
+            errors=errors,
         )
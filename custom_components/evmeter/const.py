@@ -2,8 +2,109 @@
 
 DOMAIN = "evmeter"
 
+# Entry data key of a fleet entry's charger IDs; single-charger entries keep
+# "charger_id"
+CONF_CHARGER_IDS = "charger_ids"
+
+# Length of a charger ID, the hex form of the Charger ID field of its frames
+CHARGER_ID_HEX_DIGITS = 12
+# Requests in a row an unclaimed Charger ID field must answer before it is taken
+# as the charger's, and timed out requests in a row, while unclaimed frames
+# arrive, before a charger's field is learned again
+FRAME_KEY_CONFIRMATIONS = 3
+
+# hass.data[DOMAIN] keys of the shared connection pool and the per-user fleets
+DATA_CONNECTION_POOL = "connection_pool"
+DATA_FLEETS = "fleets"
+
+# Poll intervals in seconds, chosen from the last decoded charger state
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_CHARGING_SCAN_INTERVAL = "charging_scan_interval"
+CONF_WAITING_SCAN_INTERVAL = "waiting_scan_interval"
+CONF_UNPLUGGED_SCAN_INTERVAL = "unplugged_scan_interval"
+
 # Default update interval in seconds
 DEFAULT_SCAN_INTERVAL = 60
+# While a session is charging
+DEFAULT_CHARGING_SCAN_INTERVAL = 10
+# While an EV wants to charge
+DEFAULT_WAITING_SCAN_INTERVAL = 30
+# While no EV is plugged in
+DEFAULT_UNPLUGGED_SCAN_INTERVAL = 300
+
+# Deadbands below which measurement sensors skip writing a new state, and the
+# longest a sensor may stay silent before it writes anyway
+CONF_VOLTAGE_DEADBAND = "voltage_deadband"
+CONF_CURRENT_DEADBAND = "current_deadband"
+CONF_POWER_DEADBAND = "power_deadband"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_MAX_SILENCE = "max_silence"
+
+# V
+DEFAULT_VOLTAGE_DEADBAND = 1.0
+# A
+DEFAULT_CURRENT_DEADBAND = 0.2
+# kW
+DEFAULT_POWER_DEADBAND = 0.05
+# °C
+DEFAULT_TEMPERATURE_DEADBAND = 1.0
+# Seconds
+DEFAULT_MAX_SILENCE = 600
+
+# How long in seconds the last good snapshot is served while refreshes fail,
+# before the charger's entities become unavailable
+CONF_STALE_GRACE = "stale_grace"
+DEFAULT_STALE_GRACE = 300
+# Seconds until the one quick retry after a refresh fails within the grace period
+STALE_RETRY_INTERVAL = 15
+
+# Request timeouts in seconds follow each charger's measured round trip
+# time, within these bounds
+CONF_MIN_REQUEST_TIMEOUT = "min_request_timeout"
+CONF_MAX_REQUEST_TIMEOUT = "max_request_timeout"
+DEFAULT_MIN_REQUEST_TIMEOUT = 2
+DEFAULT_MAX_REQUEST_TIMEOUT = 10
+
+# A charger that times out this many times in a row is only probed, at
+# intervals in seconds doubling from the minimum up to the maximum, until it
+# answers again
+BREAKER_TIMEOUTS = 3
+BREAKER_PROBE_MIN = 60
+BREAKER_PROBE_MAX = 3600
+
+# Config flow validation: seconds to wait for the MQTT connection and for the
+# charger's reply, and how long the validated connection is kept open for the
+# entry about to be created
+VALIDATION_CONNECT_TIMEOUT = 10
+VALIDATION_PROBE_TIMEOUT = 2
+VALIDATION_LINGER = 60
+# Chargers probed at the same time when validating a fleet
+FLEET_VALIDATION_CONCURRENCY = 8
+
+# Chargers of a user are polled together: a poll cycle takes every charger due
+# within this many seconds, with at most this many requests in flight
+FLEET_BATCH_WINDOW = 1
+FLEET_MAX_CONCURRENT_REQUESTS = 16
+
+# Latest samples per stage kept for the rolling latency figures
+TIMING_WINDOW = 100
+
+# Seconds between writes of the last frame of each charger, which is decoded
+# at startup so entities come up with their last known values
+SNAPSHOT_SAVE_DELAY = 60
+
+# Raw response frames per user topic kept for config entry diagnostics
+FRAME_LOG_SIZE = 50
+
+# Reconnect backoff in seconds, and the consecutive failed attempts after
+# which the connection is reported as failed
+RECONNECT_BACKOFF_MIN = 1
+RECONNECT_BACKOFF_MAX = 300
+RECONNECT_FAILED_ATTEMPTS = 5
+
+# Heartbeat poll interval in seconds while frames are being pushed on the
+# user response topic
+PUSH_HEARTBEAT_INTERVAL = 300
 
 # MQTT settings (hardcoded per PRD)
 MQTT_HOST = "iot.nayax.com"
@@ -1,41 +1,135 @@
 """Data update coordinator for the EV-Meter integration."""
 
+from __future__ import annotations
+
 import logging
-from datetime import timedelta
-from typing import Any
+import time
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from evmeter_client.exceptions import (
+    EVMeterError,
+    EVMeterProtocolError,
+    EVMeterTimeoutError,
+)
+from evmeter_client.models import ChargerState, ChargerStatus, ChargingState, EVStatus
 
-from evmeter_client import EVMeterClient, EVMeterConfig
-from evmeter_client.exceptions import EVMeterError, EVMeterTimeoutError
+from .api import (
+    ChargerSnapshot,
+    EVMeterApiClient,
+    snapshot_from_response,
+)
+from .breaker import CircuitBreaker
+from .const import (
+    CONF_CHARGING_SCAN_INTERVAL,
+    CONF_MAX_REQUEST_TIMEOUT,
+    CONF_MIN_REQUEST_TIMEOUT,
+    CONF_SCAN_INTERVAL,
+    CONF_STALE_GRACE,
+    CONF_UNPLUGGED_SCAN_INTERVAL,
+    CONF_WAITING_SCAN_INTERVAL,
+    DEFAULT_CHARGING_SCAN_INTERVAL,
+    DEFAULT_MAX_REQUEST_TIMEOUT,
+    DEFAULT_MIN_REQUEST_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_GRACE,
+    DEFAULT_UNPLUGGED_SCAN_INTERVAL,
+    DEFAULT_WAITING_SCAN_INTERVAL,
+    DOMAIN,
+    PUSH_HEARTBEAT_INTERVAL,
+    STALE_RETRY_INTERVAL,
+)
+from .decoder import decode_response
+from .session import ChargingSession
+from .storage import EVMeterSnapshotStore
+from .timing import StageTimings
 
-from .const import DOMAIN
+if TYPE_CHECKING:
+    from .fleet import EVMeterFleet
 
 _LOGGER = logging.getLogger(__name__)
 
+CHARGING_STATES = (ChargingState.CHARGING_1_PHASE, ChargingState.CHARGING_3_PHASE)
+
 
 class EVMeterCoordinator(DataUpdateCoordinator):
     """Manages fetching data from the EV-Meter client."""
 
     def __init__(
-        self, hass: HomeAssistant, config_data: dict[str, Any], charger_id: str
+        self,
+        hass: HomeAssistant,
+        client: EVMeterApiClient,
+        charger_id: str,
+        options: Mapping[str, Any] | None = None,
+        fleet: EVMeterFleet | None = None,
+        store: EVMeterSnapshotStore | None = None,
     ):
-        """Initialize the data update coordinator."""
+        """Initialize the data update coordinator.
+
+        The client is borrowed from the connection pool and may be shared with
+        the coordinators of other chargers of the same user. With a fleet, the
+        fleet runs the scheduled polls of all of them together. With a store,
+        the last frame received is saved for the next startup.
+        """
+        options = options or {}
+        self._scan_interval = timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        )
+        self._charging_scan_interval = timedelta(
+            seconds=options.get(
+                CONF_CHARGING_SCAN_INTERVAL, DEFAULT_CHARGING_SCAN_INTERVAL
+            )
+        )
+        self._waiting_scan_interval = timedelta(
+            seconds=options.get(
+                CONF_WAITING_SCAN_INTERVAL, DEFAULT_WAITING_SCAN_INTERVAL
+            )
+        )
+        self._unplugged_scan_interval = timedelta(
+            seconds=options.get(
+                CONF_UNPLUGGED_SCAN_INTERVAL, DEFAULT_UNPLUGGED_SCAN_INTERVAL
+            )
+        )
+
+        self._stale_grace = timedelta(
+            seconds=options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE)
+        )
+
+        # Serving the last snapshot again must not notify listeners, so only
+        # changed data is pushed to entities
         super().__init__(
             hass,
             _LOGGER,
             name=f"EVMeter-{charger_id}",
-            update_interval=timedelta(seconds=60),  # Update every minute
+            update_interval=self._scan_interval,
+            always_update=False,
         )
 
-        # Per PRD: MQTT settings are hardcoded
-        client_config = EVMeterConfig(
-            user_id=config_data["user_id"],
-        )
-        self.client = EVMeterClient(client_config)
+        self.client = client
         self.charger_id = charger_id
+        client.set_timeout_bounds(
+            charger_id,
+            options.get(CONF_MIN_REQUEST_TIMEOUT, DEFAULT_MIN_REQUEST_TIMEOUT),
+            options.get(CONF_MAX_REQUEST_TIMEOUT, DEFAULT_MAX_REQUEST_TIMEOUT),
+        )
+        self._fleet = fleet
+        self._store = store
+        if fleet is not None:
+            fleet.async_add(self)
+        # Request stage durations of this charger's round trips
+        self.timings = StageTimings()
+        # Running figures of the current or last charging session
+        self.session = ChargingSession()
+        # Whether the quick retry after a failed refresh has been used
+        self._stale_retried = False
+        # Stops polling the charger while it keeps timing out
+        self.breaker = CircuitBreaker()
         self.device_info = DeviceInfo(
             identifiers={(DOMAIN, self.charger_id)},
             name=f"EV-Meter Charger {self.charger_id}",
@@ -43,92 +137,211 @@ class EVMeterCoordinator(DataUpdateCoordinator):
             model="EV Charger",
         )
 
+        # Frames for this charger that arrive on the user topic without being
+        # requested are pushed straight into the coordinator
+        self._last_push: float | None = None
+        # Seconds between the last two pushes
+        self._push_gap: float | None = None
+        self._remove_frame_listener = self.client.add_frame_listener(
+            self.charger_id, self._handle_pushed_frame
+        )
+
+    @callback
+    def _handle_pushed_frame(self, response: dict[str, Any]) -> None:
+        """Update from an unsolicited WorkingInfo frame for this charger."""
+        _LOGGER.debug("Pushed WorkingInfo frame received for %s", self.charger_id)
+        now = time.monotonic()
+        if self._last_push is not None:
+            self._push_gap = now - self._last_push
+        self._last_push = now
+        self._record_frame()
+        self.async_set_updated_data(
+            self._process_snapshot(snapshot_from_response(self.charger_id, response))
+        )
+
+    def _poll_interval(self, status: ChargerStatus) -> timedelta:
+        """Pick the next poll interval from the last decoded charger state."""
+        interval = self._state_interval(status)
+        # While pushes keep arriving at least as often as polls would, polling
+        # is only a heartbeat. One push, like the reply to a request from the
+        # mobile app, is not a stream.
+        if (
+            self._push_gap is not None
+            and self._last_push is not None
+            and self._push_gap <= interval.total_seconds()
+            and time.monotonic() - self._last_push <= interval.total_seconds()
+        ):
+            return max(interval, timedelta(seconds=PUSH_HEARTBEAT_INTERVAL))
+        return interval
+
+    def _state_interval(self, status: ChargerStatus) -> timedelta:
+        """Return the poll interval for a charger state."""
+        if status.charging_state in CHARGING_STATES:
+            return self._charging_scan_interval
+        if (
+            status.state is ChargerState.WANTS_TO_CHARGE
+            or status.ev_status is EVStatus.WANTS_TO_CHARGE
+        ):
+            return self._waiting_scan_interval
+        if (
+            status.state is ChargerState.NOT_CONNECTED
+            or status.ev_status is EVStatus.NOT_CONNECTED
+        ):
+            return self._unplugged_scan_interval
+        return self._scan_interval
+
+    @callback
+    def async_restore(self, frame: bytes, received_at: datetime) -> None:
+        """Start from a frame saved before the last restart.
+
+        The data keeps the frame's original receive time, so its age shows
+        and it is only served as stale data within the grace period.
+        """
+        try:
+            snapshot = snapshot_from_response(self.charger_id, decode_response(frame))
+        except EVMeterProtocolError as err:
+            _LOGGER.debug("Ignoring saved frame for %s: %s", self.charger_id, err)
+            return
+        self.data = self._process_snapshot(snapshot, received_at)
+
+    def _process_snapshot(
+        self, snapshot: ChargerSnapshot, received_at: datetime | None = None
+    ) -> dict[str, Any]:
+        """Turn a decoded snapshot into coordinator data."""
+        status = snapshot.status
+        self._stale_retried = False
+        for stage, seconds in snapshot.timings.items():
+            self.timings.record(stage, seconds)
+
+        # Refreshes are scheduled after the data is set, so this takes effect
+        # for the next poll
+        self.update_interval = self._poll_interval(status)
+
+        # Update device info with firmware version on first successful fetch
+        if status.kubis_version and not self.device_info.get("sw_version"):
+            self.device_info = DeviceInfo(
+                identifiers={(DOMAIN, self.charger_id)},
+                name=f"EV-Meter Charger {self.charger_id}",
+                manufacturer="EV-Meter",
+                model="EV Charger",
+                sw_version=status.kubis_version,
+            )
+
+        now = received_at or dt_util.utcnow()
+        if self._store is not None and snapshot.frame is not None:
+            self._store.async_save_frame(self.charger_id, snapshot.frame, now)
+        self.session.update(
+            now,
+            status.charging_state in CHARGING_STATES,
+            snapshot.metrics,
+            three_phase=status.charging_state is ChargingState.CHARGING_3_PHASE,
+        )
+
+        return {
+            "status": status,
+            "metrics": snapshot.metrics,
+            "received_at": now,
+            "session": self.session.as_dict(now),
+            "breaker": self.breaker.as_dict(),
+            # The timings themselves, summarized only when a latency sensor
+            # is written; connection stages are shared by the client's chargers
+            "timings": self.timings,
+            "connection_timings": self.client.timings,
+        }
+
+    def _serve_stale(self, err: EVMeterError) -> dict[str, Any]:
+        """Keep the last good snapshot while it is within the grace window."""
+        within_grace = (
+            self.data is not None
+            and dt_util.utcnow() - self.data["received_at"] <= self._stale_grace
+        )
+        regular = (
+            self._scan_interval
+            if self.data is None
+            else self._poll_interval(self.data["status"])
+        )
+        if (probe_interval := self.breaker.probe_interval) is not None:
+            # Only probe a charger that keeps timing out
+            self.update_interval = timedelta(seconds=probe_interval)
+        elif within_grace and not self._stale_retried:
+            # Retry once soon, so a brief hiccup is bridged without waiting a
+            # whole poll interval; after that the charger's regular interval
+            # applies, so an offline charger or broker is not polled harder
+            self._stale_retried = True
+            self.update_interval = min(regular, timedelta(seconds=STALE_RETRY_INTERVAL))
+        else:
+            self.update_interval = regular
+        if not within_grace:
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        if (breaker := self.breaker.as_dict()) != self.data["breaker"]:
+            # The frame is unchanged, but the breaker state is written
+            return self.data | {"breaker": breaker}
+        return self.data
+
+    def _record_timeout(self) -> None:
+        """Count a timeout against the charger's circuit breaker."""
+        if self.breaker.record_timeout():
+            _LOGGER.warning(
+                "Charger %s did not answer %s requests in a row; probing it "
+                "every %ss until it answers",
+                self.charger_id,
+                self.breaker.consecutive_timeouts,
+                self.breaker.probe_interval,
+            )
+
+    def _record_frame(self) -> None:
+        """Close the charger's circuit breaker on any frame from it."""
+        if self.breaker.record_frame():
+            _LOGGER.info("Charger %s is answering again", self.charger_id)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Book the next poll with the fleet instead of arming a timer."""
+        if self._fleet is None:
+            super()._schedule_refresh()
+            return
+        if self.update_interval is None or (
+            self.config_entry and self.config_entry.pref_disable_polling
+        ):
+            return
+        self._async_unsub_refresh()
+        self._unsub_refresh = self._fleet.async_schedule(
+            self, self.update_interval.total_seconds()
+        )
+
+    async def async_handle_scheduled_refresh(self) -> None:
+        """Run a scheduled poll on behalf of the fleet."""
+        await self._handle_refresh_interval()
+
     async def async_shutdown(self):
         """Clean shutdown of the coordinator."""
         _LOGGER.debug("Shutting down EVMeter coordinator for %s", self.charger_id)
-        try:
-            await self.client.disconnect()
-        except Exception as err:
-            _LOGGER.debug("Error during coordinator shutdown: %s", err)
+        self._remove_frame_listener()
+        if self._fleet is not None:
+            self._fleet.async_remove(self)
+        await super().async_shutdown()
 
     async def _async_update_data(self):
-        """Fetch data from the EV-Meter client."""
-        try:
-            # Always ensure we have a valid connection
-            await self._ensure_connected()
-
-            status = await self.client.get_charger_status(self.charger_id)
-            metrics = await self.client.get_charger_metrics(self.charger_id)
-
-            # Update device info with firmware version on first successful fetch
-            if status.kubis_version and not self.device_info.get("sw_version"):
-                self.device_info = DeviceInfo(
-                    identifiers={(DOMAIN, self.charger_id)},
-                    name=f"EV-Meter Charger {self.charger_id}",
-                    manufacturer="EV-Meter",
-                    model="EV Charger",
-                    sw_version=status.kubis_version,
-                )
-
-            return {
-                "status": status,
-                "metrics": metrics,
-            }
-        except (EVMeterError, EVMeterTimeoutError) as err:
-            # If we get a connection error, try to reconnect on next update
-            error_msg = str(err).lower()
-            if any(
-                keyword in error_msg
-                for keyword in [
-                    "not currently connected",
-                    "connection",
-                    "mqtt",
-                    "disconnected",
-                    "code:4",  # MQTT code 4 is "not connected"
-                ]
-            ):
-                _LOGGER.warning(
-                    "MQTT connection lost (%s), will attempt reconnection on next update",
-                    err,
-                )
-                try:
-                    await self.client.disconnect()
-                except Exception:
-                    pass  # Ignore disconnect errors
-                self.client._client = None  # Reset client state
-            elif isinstance(err, EVMeterTimeoutError):
-                _LOGGER.debug("Charger timeout (may be offline): %s", err)
-            else:
-                _LOGGER.error("Unexpected error: %s", err)
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        """Fetch data from the EV-Meter client.
 
-    async def _ensure_connected(self):
-        """Ensure the MQTT client is connected and ready."""
+        When a fetch fails, the last good snapshot is served unchanged for up
+        to the stale grace period, so short outages do not make every entity
+        unavailable and then available again.
+        """
         try:
-            # Check if client exists and try a simple operation to test connection
-            if not self.client._client:
-                _LOGGER.debug("No MQTT client found, establishing connection")
-                await self.client.connect()
-            else:
-                # Test if the connection is still alive by checking client state
-                # If the client exists but is disconnected, aiomqtt will raise an error
-                try:
-                    # This will raise an exception if not connected
-                    if (
-                        not hasattr(self.client._client, "_client")
-                        or not self.client._client._client.is_connected()
-                    ):
-                        _LOGGER.info("MQTT client disconnected, reconnecting")
-                        await self.client.disconnect()
-                        await self.client.connect()
-                except Exception:
-                    # If we can't check connection state, assume disconnected and reconnect
-                    _LOGGER.info("Unable to verify MQTT connection state, reconnecting")
-                    try:
-                        await self.client.disconnect()
-                    except Exception:
-                        pass
-                    await self.client.connect()
-        except Exception as err:
-            _LOGGER.error("Failed to establish MQTT connection: %s", err)
-            raise EVMeterError(f"Connection failed: {err}") from err
+            # Cheap while connected; reconnecting is left to the client's
+            # connection state machine
+            await self.client.async_wait_connected(self.client.config.response_timeout)
+
+            # Status and metrics come from the same WorkingInfo frame, so one
+            # round trip fills both
+            snapshot = await self.client.get_charger_snapshot(self.charger_id)
+            self._record_frame()
+            return self._process_snapshot(snapshot)
+        except EVMeterTimeoutError as err:
+            _LOGGER.debug("Charger timeout (may be offline): %s", err)
+            self._record_timeout()
+            return self._serve_stale(err)
+        except EVMeterError as err:
+            _LOGGER.warning("Error updating charger %s: %s", self.charger_id, err)
+            return self._serve_stale(err)
@@ -0,0 +1,174 @@
+"""Zero-copy decoder for BLEWIFI WorkingInfo responses.
+
+``evmeter_client.parser`` turns each payload into a hex string, back into
+bytes, and then reads every field through ``islice`` into a fresh ``bytes``
+object. This walks the payload once through a ``memoryview`` instead, reading
+each fixed-width run of fields with one precompiled ``struct.Struct``, and
+decodes the two length-prefixed strings straight from the view.
+
+The result has the same shape as ``parse_blewifi_payload`` for the keys the
+integration uses (``type``, ``status`` and ``working_info``). Frames that do
+not fit the WorkingInfo layout go to the library parser, which handles
+truncated frames.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+from evmeter_client.parser import parse_blewifi_payload
+
+# Message type byte of a WorkingInfo inner payload (PROTOCOL.md 4.2)
+WORKING_INFO_TYPE = 0x03
+
+_LENGTH = struct.Struct("<H")
+# Message type, charger status, EVSE status
+_HEAD = struct.Struct("<BBI")
+# EV status, charging state, warnings, errors, voltage ph1-3, current ph1-3,
+# session energy, total energy, phase type, set current, firmware, limit
+_MEASUREMENTS = struct.Struct("<4B3H3H2I2BHI")
+# Grid type, MQTT type, charger ID, start time, scheduler version, circuit
+# breaker, DLM current ph1-3, temperature, peer serial, avg ping latency
+_TRAILER = struct.Struct("<2B2Q2I3HB2I")
+
+# Enum names as produced by evmeter_client.parser, indexed by wire value
+_EV_STATUS = (
+    "UNKNOWN",
+    "NOT_CONNECTED",
+    "CONNECTED",
+    "WANTS_TO_CHARGE",
+    "NEED_TO_VENTILATE",
+    "ERROR_STATE",
+)
+_CHARGING_STATE = (
+    "UNKNOWN",
+    "NOT_CHARGING",
+    "CHARGING_1_PHASE",
+    "CHARGING_3_PHASE",
+    "WAITING_FOR_EV_AO",
+    "ALWAYS_ON_1_PHASE",
+    "ALWAYS_ON_3_PHASE",
+    "WAITING_FOR_EV",
+)
+_PHASE_TYPE = ("UNKNOWN", "PHASE_1", "PHASE_3")
+_GRID_TYPE = ("UNKNOWN", "TN_S", "IT", "USA_1F_IT")
+_MQTT_TYPE = (
+    "UNKNOWN",
+    "WORKING_PROPERLY",
+    "MQTT_NOT_CONFIGURED",
+    "UNABLE_TO_CONNECT_BROKER",
+    "UNABLE_TO_CONNECT_WIFI",
+    "UNABLE_TO_DETECT_WIFI",
+    "WIFI_NOT_CONNECTED",
+)
+
+
+def _name(names: tuple[str, ...], value: int, unknown: str | None = None) -> str:
+    """Return the enum name for a wire value, as the library parser does."""
+    if value < len(names):
+        return names[value]
+    return unknown or f"UNKNOWN_{value}"
+
+
+def _read_string(view: memoryview, offset: int) -> tuple[str, int]:
+    """Return a length-prefixed string and the offset just past it."""
+    (length,) = _LENGTH.unpack_from(view, offset)
+    start = offset + _LENGTH.size
+    end = start + length
+    if end > len(view):
+        raise struct.error("string runs past the end of the payload")
+    return str(view[start:end], "ascii", "replace"), end
+
+
+def _decode_working_info(view: memoryview, offset: int, evse: int) -> dict[str, Any]:
+    """Decode the WorkingInfo fields that follow the message header."""
+    kubis_version, offset = _read_string(view, offset)
+    (
+        ev_status,
+        charging_state,
+        warnings,
+        errors,
+        voltage_ph1,
+        voltage_ph2,
+        voltage_ph3,
+        current_ph1,
+        current_ph2,
+        current_ph3,
+        session,
+        total,
+        phase_type,
+        set_current,
+        firmware_version,
+        limit,
+    ) = _MEASUREMENTS.unpack_from(view, offset)
+    offset += _MEASUREMENTS.size
+
+    wifi, offset = _read_string(view, offset)
+    (
+        grid_type,
+        mqtt_type,
+        charger_id,
+        start_time,
+        scheduler_version,
+        circuit_break,
+        dlm_current_ph1,
+        dlm_current_ph2,
+        dlm_current_ph3,
+        temperature,
+        peer_serial_number,
+        avg_ping_latency,
+    ) = _TRAILER.unpack_from(view, offset)
+
+    return {
+        "evse": evse,
+        "kubisVersion": kubis_version,
+        "evStatus": _name(_EV_STATUS, ev_status, "UNKNOWN"),
+        "chargingState": _name(_CHARGING_STATE, charging_state, "UNKNOWN"),
+        "warnings": warnings,
+        "errors": errors,
+        "voltagePh1": voltage_ph1 / 4.0,
+        "voltagePh2": voltage_ph2 / 4.0,
+        "voltagePh3": voltage_ph3 / 4.0,
+        "currentPh1": current_ph1 / 10.0,
+        "currentPh2": current_ph2 / 10.0,
+        "currentPh3": current_ph3 / 10.0,
+        "session": session,
+        "total": total,
+        "phase_type": _name(_PHASE_TYPE, phase_type),
+        "setCurrent": set_current,
+        "firmwareVersion": firmware_version,
+        "limit": "UNLIMITED" if limit == 0xFFFFFFFF else limit,
+        "wifi": wifi,
+        "grid_type": _name(_GRID_TYPE, grid_type),
+        "mqtt_type": _name(_MQTT_TYPE, mqtt_type),
+        "id": charger_id,
+        "startTime": start_time,
+        "schedulerVersion": scheduler_version,
+        "circuitBreak": circuit_break,
+        "dlmCurrentPh1": dlm_current_ph1 / 10.0,
+        "dlmCurrentPh2": dlm_current_ph2 / 10.0,
+        "dlmCurrentPh3": dlm_current_ph3 / 10.0,
+        "temperature": temperature,
+        "peerSerialNumber": peer_serial_number,
+        "avgPingLatency": avg_ping_latency,
+    }
+
+
+def decode_response(payload: bytes | bytearray | memoryview) -> dict[str, Any]:
+    """Decode a raw /BLEWIFI/users response (PROTOCOL.md 4.1 and 4.2)."""
+    view = memoryview(payload)
+    try:
+        (length,) = _LENGTH.unpack_from(view, 0)
+        # Keep reads inside the inner payload, as the length header says
+        inner = view[_LENGTH.size : _LENGTH.size + length]
+        msg_type, status, evse = _HEAD.unpack_from(inner, 0)
+        if msg_type != WORKING_INFO_TYPE:
+            return {"type": msg_type, "status": status}
+        working_info = _decode_working_info(inner, _HEAD.size, evse)
+    except struct.error:
+        # Short or malformed frame; the library parser salvages what it can
+        salvaged: dict[str, Any] = parse_blewifi_payload(bytes(payload))
+        return salvaged
+
+    return {"type": msg_type, "status": status, "working_info": working_info}
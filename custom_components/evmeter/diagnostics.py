@@ -0,0 +1,97 @@
+"""Diagnostics support for the EV-Meter integration."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from evmeter_client.exceptions import EVMeterError
+
+from .api import EVMeterApiClient, response_charger_id
+from .const import DOMAIN
+from .coordinator import EVMeterCoordinator
+from .decoder import decode_response
+
+TO_REDACT = {"user_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Raw frames are hex encoded, one per entry, so they can be pasted into a
+    capture file for ``bulk_decode.py`` and triaged offline. Only frames of
+    this entry's chargers are included, cut after the inner payload, since
+    the bytes that follow it carry the User UUID (PROTOCOL.md 4.1).
+    """
+    coordinators: dict[str, EVMeterCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    # Every charger of an entry shares its user's pooled client
+    client = next(iter(coordinators.values())).client
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "connection": {
+            "broker": f"{client.config.mqtt_host}:{client.config.mqtt_port}",
+            "state": client.connection_state,
+            "reconnects": client.reconnects,
+            "timings": client.timings.summary(),
+        },
+        "chargers": {
+            charger_id: _charger_diagnostics(coordinator)
+            for charger_id, coordinator in coordinators.items()
+        },
+        "frames": _frame_diagnostics(client, coordinators),
+    }
+
+
+def _frame_diagnostics(
+    client: EVMeterApiClient,
+    coordinators: dict[str, EVMeterCoordinator],
+) -> list[dict[str, Any]]:
+    """Return the logged frames of an entry's chargers, without the trailer."""
+    # The pooled client logs the frames of every charger of the user
+    keys = {client.frame_key(charger_id) for charger_id in coordinators} - {None}
+    frames = []
+    for received, frame in client.frames.entries():
+        try:
+            charger_key = response_charger_id(decode_response(frame))
+        except EVMeterError:
+            continue
+        if charger_key not in keys:
+            continue
+        length = int.from_bytes(frame[:2], "little")
+        frames.append(
+            {
+                "received_at": datetime.fromtimestamp(received, UTC).isoformat(),
+                "payload": frame[: 2 + length].hex(),
+            }
+        )
+    return frames
+
+
+def _charger_diagnostics(coordinator: EVMeterCoordinator) -> dict[str, Any]:
+    """Return the polling state, request timings and timeout of one charger."""
+    data = coordinator.data or {}
+    received_at = data.get("received_at")
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None
+        ),
+        "received_at": received_at.isoformat() if received_at else None,
+        "timings": coordinator.timings.summary(),
+        "breaker": coordinator.breaker.as_dict(),
+        "round_trip": coordinator.client.rtt_estimator(
+            coordinator.charger_id
+        ).as_dict(),
+    }
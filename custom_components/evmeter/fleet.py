@@ -0,0 +1,171 @@
+"""Fleet-wide polling of the chargers of one EV-Meter user."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .api import EVMeterApiClient
+from .const import (
+    DATA_FLEETS,
+    DOMAIN,
+    FLEET_BATCH_WINDOW,
+    FLEET_MAX_CONCURRENT_REQUESTS,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import EVMeterCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EVMeterFleet:
+    """Polls the chargers sharing one client in batched cycles.
+
+    Every charger coordinator still picks its own poll interval, but instead
+    of each arming its own timer it asks the fleet for a slot. The fleet runs
+    one timer; when it fires, every charger due within ``FLEET_BATCH_WINDOW``
+    is refreshed in the same cycle, with at most
+    ``FLEET_MAX_CONCURRENT_REQUESTS`` requests in flight. A cycle then takes
+    about as long as its slowest charger rather than the sum of all of them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: EVMeterApiClient,
+        max_concurrent: int = FLEET_MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        """Initialize the fleet."""
+        self.hass = hass
+        self.client = client
+        self.members: dict[str, EVMeterCoordinator] = {}
+        self.last_cycle_size = 0
+        self.last_cycle_duration: float | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Loop time each scheduled charger is next due at
+        self._due: dict[EVMeterCoordinator, float] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """Return the latest data of every charger, keyed by charger ID."""
+        return {
+            charger_id: coordinator.data
+            for charger_id, coordinator in self.members.items()
+        }
+
+    @callback
+    def async_add(self, coordinator: EVMeterCoordinator) -> None:
+        """Add a charger coordinator to the fleet."""
+        self.members[coordinator.charger_id] = coordinator
+
+    @callback
+    def async_remove(self, coordinator: EVMeterCoordinator) -> None:
+        """Remove a charger coordinator, dropping the fleet once it is empty."""
+        if self.members.get(coordinator.charger_id) is coordinator:
+            del self.members[coordinator.charger_id]
+        self._due.pop(coordinator, None)
+        self.async_drop_if_empty()
+
+    @callback
+    def async_drop_if_empty(self) -> None:
+        """Stop the timer and forget the fleet once it has no chargers."""
+        if self.members:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        fleets = self.hass.data.get(DOMAIN, {}).get(DATA_FLEETS, {})
+        if fleets.get(self.client) is self:
+            del fleets[self.client]
+
+    @callback
+    def async_schedule(
+        self, coordinator: EVMeterCoordinator, delay: float
+    ) -> CALLBACK_TYPE:
+        """Book a charger's next poll and return a callable that cancels it."""
+        # Whole-second slots line up chargers that share a poll interval
+        due = math.ceil(self.hass.loop.time() + delay)
+        self._due[coordinator] = due
+        self._arm()
+
+        @callback
+        def cancel() -> None:
+            if self._due.get(coordinator) == due:
+                del self._due[coordinator]
+
+        return cancel
+
+    @callback
+    def _arm(self) -> None:
+        """Set the timer for the earliest booked poll."""
+        if not self._due:
+            return
+        earliest = min(self._due.values())
+        if self._timer is not None:
+            if self._timer.when() <= earliest:
+                return
+            self._timer.cancel()
+        self._timer = self.hass.loop.call_at(earliest, self._start_cycle)
+
+    @callback
+    def _start_cycle(self) -> None:
+        """Start a poll cycle for the chargers that are due."""
+        self._timer = None
+        horizon = self.hass.loop.time() + FLEET_BATCH_WINDOW
+        batch = [
+            coordinator for coordinator, due in self._due.items() if due <= horizon
+        ]
+        for coordinator in batch:
+            del self._due[coordinator]
+        self._arm()
+        if batch:
+            self.hass.async_create_background_task(
+                self._async_cycle(batch), f"evmeter fleet {self.client.config.user_id}"
+            )
+
+    async def _async_cycle(self, batch: list[EVMeterCoordinator]) -> None:
+        """Refresh a batch of chargers with bounded concurrency."""
+        start = time.monotonic()
+        await asyncio.gather(
+            *(self._async_refresh(coordinator) for coordinator in batch)
+        )
+        self.last_cycle_size = len(batch)
+        self.last_cycle_duration = time.monotonic() - start
+        _LOGGER.debug(
+            "Polled %s chargers of user %s in %.2fs",
+            len(batch),
+            self.client.config.user_id,
+            self.last_cycle_duration,
+        )
+
+    async def async_refresh_all(self, coordinators: list[EVMeterCoordinator]) -> None:
+        """Refresh chargers now, such as after setup, with bounded concurrency."""
+
+        async def refresh(coordinator: EVMeterCoordinator) -> None:
+            async with self._semaphore:
+                await coordinator.async_refresh()
+
+        await asyncio.gather(*(refresh(coordinator) for coordinator in coordinators))
+
+    async def _async_refresh(self, coordinator: EVMeterCoordinator) -> None:
+        """Run one charger's scheduled refresh once a request slot is free."""
+        async with self._semaphore:
+            await coordinator.async_handle_scheduled_refresh()
+
+
+@callback
+def get_fleet(hass: HomeAssistant, client: EVMeterApiClient) -> EVMeterFleet:
+    """Return the fleet of a pooled client, creating it on first use."""
+    fleets: dict[EVMeterApiClient, EVMeterFleet] = hass.data.setdefault(
+        DOMAIN, {}
+    ).setdefault(DATA_FLEETS, {})
+    if (fleet := fleets.get(client)) is None:
+        fleet = fleets[client] = EVMeterFleet(hass, client)
+    return fleet
@@ -0,0 +1,40 @@
+"""Bounded log of the raw frames received on a user topic."""
+
+from __future__ import annotations
+
+from .const import FRAME_LOG_SIZE
+
+
+class FrameLog:
+    """Keep the last frames and their receive times in a fixed ring.
+
+    The slots are allocated up front and overwritten in place, so the log
+    never grows however many frames arrive.
+    """
+
+    def __init__(self, size: int = FRAME_LOG_SIZE) -> None:
+        """Initialize the log."""
+        self._times: list[float] = [0.0] * size
+        self._frames: list[bytes] = [b""] * size
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of frames held."""
+        return self._count
+
+    def append(self, received: float, frame: bytes) -> None:
+        """Store a frame, overwriting the oldest once the ring is full."""
+        self._times[self._next] = received
+        self._frames[self._next] = frame
+        self._next = (self._next + 1) % len(self._frames)
+        self._count = min(self._count + 1, len(self._frames))
+
+    def entries(self) -> list[tuple[float, bytes]]:
+        """Return the frames held, oldest first, with their receive times."""
+        size = len(self._frames)
+        start = (self._next - self._count) % size
+        return [
+            (self._times[(start + i) % size], self._frames[(start + i) % size])
+            for i in range(self._count)
+        ]
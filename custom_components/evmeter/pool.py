@@ -0,0 +1,88 @@
+"""Shared MQTT connections for EV-Meter config entries."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from evmeter_client import EVMeterConfig
+
+from .api import EVMeterApiClient
+from .const import DATA_CONNECTION_POOL, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+PoolKey = tuple[str, int, str]
+
+
+class EVMeterConnectionPool:
+    """Reference-counted clients keyed by broker and user ID.
+
+    Every charger of a user gets its responses on the same
+    ``/BLEWIFI/users/{user_id}`` topic, so config entries sharing a user ID
+    share one connection and one subscription.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the pool."""
+        self._clients: dict[PoolKey, EVMeterApiClient] = {}
+        self._refcounts: dict[PoolKey, int] = {}
+
+    @staticmethod
+    def _key(config: EVMeterConfig) -> PoolKey:
+        """Return the pool key for a client configuration."""
+        return (config.mqtt_host, config.mqtt_port, config.user_id)
+
+    @callback
+    def acquire(self, config: EVMeterConfig) -> EVMeterApiClient:
+        """Borrow the client for a broker and user ID, creating it if needed."""
+        key = self._key(config)
+        if (client := self._clients.get(key)) is None:
+            _LOGGER.debug("Creating pooled EV-Meter client for %s:%s", *key[:2])
+            client = self._clients[key] = EVMeterApiClient(config)
+            self._refcounts[key] = 0
+            client.async_start()
+        self._refcounts[key] += 1
+        return client
+
+    async def async_release(self, client: EVMeterApiClient) -> None:
+        """Return a borrowed client, disconnecting it when no one uses it."""
+        key = self._key(client.config)
+        if self._clients.get(key) is not client:
+            return
+        self._refcounts[key] -= 1
+        if self._refcounts[key] > 0:
+            return
+
+        del self._clients[key]
+        del self._refcounts[key]
+        _LOGGER.debug("Closing pooled EV-Meter client for %s:%s", *key[:2])
+        await client.async_stop()
+
+    @callback
+    def release_later(
+        self, hass: HomeAssistant, client: EVMeterApiClient, delay: float
+    ) -> None:
+        """Return a borrowed client after a delay.
+
+        Keeps a connection warm for a borrower that is about to take it, such
+        as the config entry created right after the config flow validated it.
+        """
+
+        async def release(_now: datetime) -> None:
+            await self.async_release(client)
+
+        async_call_later(hass, delay, release)
+
+
+@callback
+def get_connection_pool(hass: HomeAssistant) -> EVMeterConnectionPool:
+    """Return the connection pool, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    pool: EVMeterConnectionPool | None = domain_data.get(DATA_CONNECTION_POOL)
+    if pool is None:
+        pool = domain_data[DATA_CONNECTION_POOL] = EVMeterConnectionPool()
+    return pool
@@ -2,6 +2,11 @@
 
 from __future__ import annotations
 
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -10,6 +15,7 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    PERCENTAGE,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
     UnitOfEnergy,
@@ -17,226 +23,385 @@ from homeassistant.const import (
     UnitOfTemperature,
     UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from evmeter_client.models import ChargerState
 
-from .const import DOMAIN
+from .const import (
+    CONF_CURRENT_DEADBAND,
+    CONF_MAX_SILENCE,
+    CONF_POWER_DEADBAND,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_VOLTAGE_DEADBAND,
+    DEFAULT_CURRENT_DEADBAND,
+    DEFAULT_MAX_SILENCE,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DEFAULT_VOLTAGE_DEADBAND,
+    DOMAIN,
+)
 from .coordinator import EVMeterCoordinator
+from .timing import CONNECTION_STAGES
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVMeterSensorEntityDescription(SensorEntityDescription):
+    """Describes an EV-Meter sensor and how to read its value."""
+
+    # Reads the value from coordinator data ({"status": ..., "metrics": ...})
+    value_fn: Callable[[dict[str, Any]], StateType]
+    # Reads extra state attributes from coordinator data, if the sensor has any
+    attributes_fn: Callable[[dict[str, Any]], dict[str, Any] | None] | None = None
+
+
+def _latency_description(stage: str, name: str) -> EVMeterSensorEntityDescription:
+    """Describe the rolling p95 of one round trip stage, with p50 and max."""
+    source = "connection_timings" if stage in CONNECTION_STAGES else "timings"
+
+    def value_fn(data: dict[str, Any]) -> StateType:
+        summary = data[source].stage_summary(stage)
+        return summary["p95"] if summary else None
+
+    return EVMeterSensorEntityDescription(
+        key=f"{stage}_latency",
+        name=f"{name} Latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:timer-outline",
+        entity_registry_enabled_default=False,  # Diagnostic sensor
+        value_fn=value_fn,
+        attributes_fn=lambda data: data[source].stage_summary(stage),
+    )
+
+
+# Measurement sensors of these classes get a deadband, as (option, default)
+DEADBAND_OPTIONS: dict[SensorDeviceClass, tuple[str, float]] = {
+    SensorDeviceClass.VOLTAGE: (CONF_VOLTAGE_DEADBAND, DEFAULT_VOLTAGE_DEADBAND),
+    SensorDeviceClass.CURRENT: (CONF_CURRENT_DEADBAND, DEFAULT_CURRENT_DEADBAND),
+    SensorDeviceClass.POWER: (CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND),
+    SensorDeviceClass.TEMPERATURE: (
+        CONF_TEMPERATURE_DEADBAND,
+        DEFAULT_TEMPERATURE_DEADBAND,
+    ),
+}
 
 # Define comprehensive sensor entity descriptions
-SENSOR_TYPES: tuple[SensorEntityDescription, ...] = (
+SENSOR_TYPES: tuple[EVMeterSensorEntityDescription, ...] = (
     # Status sensors
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="status",
         name="Charger Status",
         icon="mdi:ev-station",
         device_class=SensorDeviceClass.ENUM,
         options=[e.value for e in ChargerState],
+        value_fn=lambda data: data["status"].state.value,
+        attributes_fn=lambda data: data["breaker"],
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="ev_status",
         name="EV Status",
         icon="mdi:car-electric",
         device_class=SensorDeviceClass.ENUM,
+        value_fn=lambda data: data["status"].ev_status.value,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="charging_state",
         name="Charging State",
         icon="mdi:battery-charging",
         device_class=SensorDeviceClass.ENUM,
+        value_fn=lambda data: data["status"].charging_state.value,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="phase_type",
         name="Phase Type",
         icon="mdi:sine-wave",
         device_class=SensorDeviceClass.ENUM,
+        value_fn=lambda data: data["status"].phase_type.value,
     ),
     # Power and energy sensors
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="power",
         name="Charging Power",
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=2,
+        value_fn=lambda data: data["metrics"].power_kw,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="session_energy",
         name="Session Energy",
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
         suggested_display_precision=3,
+        value_fn=lambda data: data["metrics"].session_energy_kwh,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="total_energy",
         name="Total Energy",
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL_INCREASING,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].total_energy_kwh,
     ),
     # Voltage sensors (3-phase)
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="voltage_ph1",
         name="Voltage Phase 1",
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].voltage_ph1,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="voltage_ph2",
         name="Voltage Phase 2",
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].voltage_ph2,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="voltage_ph3",
         name="Voltage Phase 3",
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].voltage_ph3,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="voltage_avg",
         name="Average Voltage",
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         device_class=SensorDeviceClass.VOLTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].voltage_avg,
     ),
     # Current sensors (3-phase)
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="current_ph1",
         name="Current Phase 1",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].current_ph1,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="current_ph2",
         name="Current Phase 2",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].current_ph2,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="current_ph3",
         name="Current Phase 3",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].current_ph3,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="current_avg",
         name="Average Current",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         device_class=SensorDeviceClass.CURRENT,
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=1,
+        value_fn=lambda data: data["metrics"].current_avg,
     ),
     # Configuration sensors
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="set_current",
         name="Set Current",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         device_class=SensorDeviceClass.CURRENT,
         icon="mdi:current-ac",
+        value_fn=lambda data: data["status"].set_current,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="circuit_breaker",
         name="Circuit Breaker",
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         device_class=SensorDeviceClass.CURRENT,
         icon="mdi:fuse",
+        value_fn=lambda data: data["status"].circuit_breaker,
     ),
     # System sensors
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="temperature",
         name="Temperature",
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["metrics"].temperature,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="wifi_network",
         name="WiFi Network",
         icon="mdi:wifi",
+        value_fn=lambda data: data["status"].wifi_network,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="firmware_version",
         name="Firmware Version",
         icon="mdi:chip",
+        value_fn=lambda data: data["status"].firmware_version,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="kubis_version",
         name="Kubis Version",
         icon="mdi:information",
+        value_fn=lambda data: data["status"].kubis_version,
     ),
     # Diagnostic sensors
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="warnings",
         name="Warnings",
         icon="mdi:alert-outline",
+        value_fn=lambda data: data["status"].warnings,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="errors",
         name="Errors",
         icon="mdi:alert-circle-outline",
+        value_fn=lambda data: data["status"].errors,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="evse",
         name="EVSE ID",
         icon="mdi:identifier",
+        value_fn=lambda data: data["status"].evse,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="ping_latency",
         name="Ping Latency",
         native_unit_of_measurement=UnitOfTime.MILLISECONDS,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:network",
         entity_registry_enabled_default=False,  # Diagnostic sensor
+        value_fn=lambda data: data["metrics"].avg_ping_latency,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="grid_type",
         name="Grid Type",
         icon="mdi:transmission-tower",
         entity_registry_enabled_default=False,  # Diagnostic sensor
+        value_fn=lambda data: data["status"].grid_type.value,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="mqtt_type",
         name="MQTT Status",
         icon="mdi:mqtt",
         entity_registry_enabled_default=False,  # Diagnostic sensor
+        value_fn=lambda data: data["status"].mqtt_type.value,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="start_time",
         name="Start Time",
         icon="mdi:clock-start",
         entity_registry_enabled_default=False,  # Diagnostic sensor
+        value_fn=lambda data: data["status"].start_time,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="scheduler_version",
         name="Scheduler Version",
         icon="mdi:update",
         entity_registry_enabled_default=False,  # Diagnostic sensor
+        value_fn=lambda data: data["status"].scheduler_version,
     ),
-    SensorEntityDescription(
+    EVMeterSensorEntityDescription(
         key="peer_serial",
         name="Peer Serial Number",
         icon="mdi:serial-port",
         entity_registry_enabled_default=False,  # Diagnostic sensor
+        value_fn=lambda data: data["metrics"].peer_serial_number,
     ),
+    # When the shown data was received; it ages while a stale snapshot is
+    # served during a connection outage
+    EVMeterSensorEntityDescription(
+        key="data_received",
+        name="Data Received",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        icon="mdi:clock-check-outline",
+        value_fn=lambda data: data["received_at"],
+    ),
+    EVMeterSensorEntityDescription(
+        key="session_duration",
+        name="Session Duration",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda data: (
+            None
+            if (duration := data["session"]["duration"]) is None
+            else round(duration / 60, 1)
+        ),
+    ),
+    EVMeterSensorEntityDescription(
+        key="session_average_power",
+        name="Session Average Power",
+        native_unit_of_measurement=UnitOfPower.KILO_WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda data: data["session"]["average_power"],
+    ),
+    EVMeterSensorEntityDescription(
+        key="session_peak_power",
+        name="Session Peak Power",
+        native_unit_of_measurement=UnitOfPower.KILO_WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda data: data["session"]["peak_power"],
+    ),
+    EVMeterSensorEntityDescription(
+        key="session_peak_current",
+        name="Session Peak Current",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda data: (
+            None if (peaks := data["session"]["peak_currents"]) is None else max(peaks)
+        ),
+        attributes_fn=lambda data: (
+            None
+            if (peaks := data["session"]["peak_currents"]) is None
+            else {f"phase_{phase}": peak for phase, peak in enumerate(peaks, 1)}
+        ),
+    ),
+    EVMeterSensorEntityDescription(
+        key="session_phase_imbalance",
+        name="Session Phase Imbalance",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:scale-unbalanced",
+        suggested_display_precision=1,
+        value_fn=lambda data: data["session"]["phase_imbalance"],
+    ),
+    _latency_description("connect", "Connect"),
+    _latency_description("subscribe", "Subscribe"),
+    _latency_description("publish", "Publish"),
+    _latency_description("first_byte", "First Byte"),
+    _latency_description("decode", "Decode"),
 )
 
 
@@ -246,109 +411,97 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
-    coordinator: EVMeterCoordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = [EVMeterSensor(coordinator, description) for description in SENSOR_TYPES]
+    coordinators: dict[str, EVMeterCoordinator] = hass.data[DOMAIN][entry.entry_id]
+    max_silence = entry.options.get(CONF_MAX_SILENCE, DEFAULT_MAX_SILENCE)
+    entities = [
+        EVMeterSensor(
+            coordinator, description, _deadband(entry, description), max_silence
+        )
+        for coordinator in coordinators.values()
+        for description in SENSOR_TYPES
+    ]
     async_add_entities(entities)
 
 
+def _deadband(
+    entry: ConfigEntry, description: EVMeterSensorEntityDescription
+) -> float | None:
+    """Return the configured deadband for a measurement sensor, if any."""
+    if description.state_class != SensorStateClass.MEASUREMENT:
+        return None
+    if (option := DEADBAND_OPTIONS.get(description.device_class)) is None:
+        return None
+    key, default = option
+    return float(entry.options.get(key, default))
+
+
 class EVMeterSensor(CoordinatorEntity[EVMeterCoordinator], SensorEntity):
     """Representation of an EV-Meter sensor."""
 
     def __init__(
         self,
         coordinator: EVMeterCoordinator,
-        description: SensorEntityDescription,
+        description: EVMeterSensorEntityDescription,
+        deadband: float | None = None,
+        max_silence: float = DEFAULT_MAX_SILENCE,
     ) -> None:
-        """Initialize the sensor."""
+        """Initialize the sensor.
+
+        With a deadband, coordinator updates that move the value by less than
+        it are not written, unless the last write is older than max_silence.
+        """
         super().__init__(coordinator)
         self.entity_description = description
+        self._value_fn = description.value_fn
+        self._deadband = deadband
+        self._max_silence = max_silence
+        self._written_value: StateType = None
+        self._written_attributes: dict[str, Any] | None = None
+        self._written_available: bool | None = None
+        self._written_at = 0.0
         self._attr_unique_id = f"{coordinator.charger_id}_{description.key}"
         self._attr_device_info = coordinator.device_info
 
     @property
-    def native_value(self) -> str | int | float | None:
+    def native_value(self) -> StateType:
         """Return the state of the sensor."""
         if self.coordinator.data is None:
             return None
+        return self._value_fn(self.coordinator.data)
 
-        status = self.coordinator.data.get("status")
-        metrics = self.coordinator.data.get("metrics")
-        key = self.entity_description.key
-
-        # Status-based sensors
-        if key == "status" and status:
-            return status.state.value
-        if key == "ev_status" and status:
-            return status.ev_status.value
-        if key == "charging_state" and status:
-            return status.charging_state.value
-        if key == "phase_type" and status:
-            return status.phase_type.value
-
-        # Power and energy sensors
-        if key == "power" and metrics:
-            return metrics.power_kw
-        if key == "session_energy" and metrics:
-            return metrics.session_energy_kwh
-        if key == "total_energy" and metrics:
-            return metrics.total_energy_kwh
-
-        # Three-phase voltage sensors
-        if key == "voltage_ph1" and metrics:
-            return metrics.voltage_ph1
-        if key == "voltage_ph2" and metrics:
-            return metrics.voltage_ph2
-        if key == "voltage_ph3" and metrics:
-            return metrics.voltage_ph3
-        if key == "voltage_avg" and metrics:
-            return metrics.voltage_avg
-
-        # Three-phase current sensors
-        if key == "current_ph1" and metrics:
-            return metrics.current_ph1
-        if key == "current_ph2" and metrics:
-            return metrics.current_ph2
-        if key == "current_ph3" and metrics:
-            return metrics.current_ph3
-        if key == "current_avg" and metrics:
-            return metrics.current_avg
-
-        # Configuration sensors
-        if key == "set_current" and status:
-            return status.set_current
-        if key == "circuit_breaker" and status:
-            return status.circuit_breaker
-
-        # System sensors
-        if key == "temperature" and metrics:
-            return metrics.temperature
-        if key == "wifi_network" and status:
-            return status.wifi_network
-        if key == "firmware_version" and status:
-            return status.firmware_version
-        if key == "kubis_version" and status:
-            return status.kubis_version
-
-        # Diagnostic sensors
-        if key == "warnings" and status:
-            return status.warnings
-        if key == "errors" and status:
-            return status.errors
-        if key == "evse" and status:
-            return status.evse
-        if key == "ping_latency" and metrics:
-            return metrics.avg_ping_latency
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return extra state attributes, for sensors that have them."""
+        attributes_fn = self.entity_description.attributes_fn
+        if attributes_fn is None or self.coordinator.data is None:
+            return None
+        return attributes_fn(self.coordinator.data)
 
-        # Additional diagnostic sensors
-        if key == "grid_type" and status:
-            return status.grid_type.value
-        if key == "mqtt_type" and status:
-            return status.mqtt_type.value
-        if key == "start_time" and status:
-            return status.start_time
-        if key == "scheduler_version" and status:
-            return status.scheduler_version
-        if key == "peer_serial" and metrics:
-            return metrics.peer_serial_number
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state unless the change is within the deadband."""
+        if self._deadband is not None and not self._is_significant_update():
+            return
+        super()._handle_coordinator_update()
 
-        return None
+    def _is_significant_update(self) -> bool:
+        """Check the new value and attributes against the last written ones."""
+        value = self.native_value
+        attributes = self.extra_state_attributes
+        available = self.available
+        now = time.monotonic()
+        if (
+            available == self._written_available
+            and attributes == self._written_attributes
+            and isinstance(value, (int, float))
+            and isinstance(self._written_value, (int, float))
+            and self._deadband is not None
+            and abs(value - self._written_value) < self._deadband
+            and now - self._written_at < self._max_silence
+        ):
+            return False
+        self._written_value = value
+        self._written_attributes = attributes
+        self._written_available = available
+        self._written_at = now
+        return True
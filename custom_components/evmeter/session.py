@@ -0,0 +1,117 @@
+"""Running statistics of the current or last charging session."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from evmeter_client.models import ChargerMetrics
+
+SESSION_FIGURES = (
+    "duration",
+    "average_power",
+    "peak_power",
+    "peak_currents",
+    "phase_imbalance",
+)
+
+
+def phase_imbalance(currents: tuple[float, float, float]) -> float | None:
+    """Return the largest deviation from the mean phase current, in percent."""
+    mean = sum(currents) / 3
+    if mean <= 0:
+        return None
+    return max(abs(current - mean) for current in currents) / mean * 100
+
+
+class ChargingSession:
+    """Accumulate session figures from each frame with constant work.
+
+    A session starts on the first frame that reports charging and ends on
+    the first one that does not. Its figures are kept until the next session
+    starts. Frames only sample the charger, so the average power comes from
+    the session energy meter, which also counts what happened between them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no session seen yet."""
+        self.started_at: datetime | None = None
+        self.ended_at: datetime | None = None
+        self.peak_power: float = 0.0
+        self.peak_currents: list[float] = [0.0, 0.0, 0.0]
+        self._start_energy: float = 0.0
+        self._energy: float = 0.0
+        # Time-weighted phase imbalance, integrated over three-phase frames
+        self._imbalance_area: float = 0.0
+        self._imbalance_time: float = 0.0
+        self._last_imbalance: float | None = None
+        self._last_at: datetime | None = None
+
+    @property
+    def active(self) -> bool:
+        """Return whether a session is in progress."""
+        return self.started_at is not None and self.ended_at is None
+
+    def update(
+        self,
+        now: datetime,
+        charging: bool,
+        metrics: ChargerMetrics,
+        three_phase: bool = False,
+    ) -> None:
+        """Fold one frame into the session."""
+        if not charging:
+            if self.active:
+                self._advance(now)
+                self.ended_at = now
+            return
+        if not self.active:
+            self._start(now, metrics.session_energy_kwh)
+        else:
+            self._advance(now)
+
+        currents = (metrics.current_ph1, metrics.current_ph2, metrics.current_ph3)
+        self.peak_power = max(self.peak_power, metrics.power_kw)
+        for phase, current in enumerate(currents):
+            self.peak_currents[phase] = max(self.peak_currents[phase], current)
+        self._energy = metrics.session_energy_kwh
+        self._last_imbalance = phase_imbalance(currents) if three_phase else None
+
+    def _start(self, now: datetime, energy: float) -> None:
+        """Reset the accumulators for a new session."""
+        self.started_at = now
+        self.ended_at = None
+        self.peak_power = 0.0
+        self.peak_currents = [0.0, 0.0, 0.0]
+        self._start_energy = self._energy = energy
+        self._imbalance_area = self._imbalance_time = 0.0
+        self._last_imbalance = None
+        self._last_at = now
+
+    def _advance(self, now: datetime) -> None:
+        """Credit the time since the last frame to the imbalance it reported."""
+        if self._last_at is not None and self._last_imbalance is not None:
+            elapsed = (now - self._last_at).total_seconds()
+            self._imbalance_area += self._last_imbalance * elapsed
+            self._imbalance_time += elapsed
+        self._last_at = now
+
+    def as_dict(self, now: datetime) -> dict[str, Any]:
+        """Return the session figures; all None before the first session."""
+        if self.started_at is None:
+            return dict.fromkeys(SESSION_FIGURES)
+        duration = ((self.ended_at or now) - self.started_at).total_seconds()
+        energy = self._energy - self._start_energy
+        return {
+            "duration": duration,
+            "average_power": (
+                energy / (duration / 3600) if duration > 0 and energy >= 0 else None
+            ),
+            "peak_power": self.peak_power,
+            "peak_currents": tuple(self.peak_currents),
+            "phase_imbalance": (
+                self._imbalance_area / self._imbalance_time
+                if self._imbalance_time > 0
+                else None
+            ),
+        }
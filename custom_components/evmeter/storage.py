@@ -0,0 +1,77 @@
+"""Last received frame of each charger, kept across restarts."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY
+
+STORAGE_VERSION = 1
+
+
+class EVMeterSnapshotStore:
+    """Save each charger's last raw frame with its receive time.
+
+    Writes are throttled: frames only update memory, and the file is written
+    ``SNAPSHOT_SAVE_DELAY`` after the first frame not yet written, and on
+    shutdown. Later frames do not postpone that write, so a steady stream of
+    frames is still written at least that often.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store of a config entry."""
+        self._hass = hass
+        # Cancels the pending write, while one is scheduled
+        self._cancel_write: Callable[[], None] | None = None
+        self._store: Store[dict[str, dict[str, str]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+        self._frames: dict[str, dict[str, str]] = {}
+
+    async def async_load(self) -> dict[str, tuple[bytes, datetime]]:
+        """Load the saved frames, keyed by charger ID."""
+        self._frames = await self._store.async_load() or {}
+        saved = {}
+        for charger_id, item in self._frames.items():
+            received_at = dt_util.parse_datetime(item["received_at"])
+            if received_at is not None:
+                saved[charger_id] = (bytes.fromhex(item["frame"]), received_at)
+        return saved
+
+    @callback
+    def async_save_frame(
+        self, charger_id: str, frame: bytes, received_at: datetime
+    ) -> None:
+        """Remember a charger's latest frame and schedule a write if none is."""
+        self._frames[charger_id] = {
+            "frame": frame.hex(),
+            "received_at": received_at.isoformat(),
+        }
+        if self._cancel_write is None:
+            self._cancel_write = async_call_later(
+                self._hass, SNAPSHOT_SAVE_DELAY, self._async_write
+            )
+
+    @callback
+    def _async_write(self, _now: datetime) -> None:
+        """Write the frames received since the timer was set."""
+        self._cancel_write = None
+        self._hass.async_create_task(self._store.async_save(dict(self._frames)))
+
+    async def async_flush(self) -> None:
+        """Write the latest frames now instead of after the delay."""
+        if self._cancel_write is not None:
+            self._cancel_write()
+            self._cancel_write = None
+        if self._frames:
+            await self._store.async_save(dict(self._frames))
+
+    async def async_remove(self) -> None:
+        """Delete the stored frames."""
+        await self._store.async_remove()
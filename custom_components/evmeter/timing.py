@@ -0,0 +1,99 @@
+"""Latency figures and timeouts for charger round trips."""
+
+from __future__ import annotations
+
+from collections import deque
+
+from .const import TIMING_WINDOW
+
+# RFC 6298 gains of the smoothed RTT and its variation, and the number of
+# variations added to the smoothed RTT for the timeout
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_K = 4
+
+# Connection stages, timed by the client once per (re)connect
+CONNECTION_STAGES = ("connect", "subscribe")
+# Request stages, timed by the client for every round trip
+REQUEST_STAGES = ("publish", "first_byte", "decode")
+
+
+class StageTimings:
+    """Keep the latest durations of each stage and summarize them."""
+
+    def __init__(self, window: int = TIMING_WINDOW) -> None:
+        """Initialize the timings."""
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record how long one run of a stage took."""
+        if (samples := self._samples.get(stage)) is None:
+            samples = self._samples[stage] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def stage_summary(self, stage: str) -> dict[str, float | int] | None:
+        """Return p50, p95 and max in milliseconds, and the count, of a stage."""
+        if (samples := self._samples.get(stage)) is None:
+            return None
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            "p50": round(ordered[round(last * 0.5)] * 1000, 1),
+            "p95": round(ordered[round(last * 0.95)] * 1000, 1),
+            "max": round(ordered[last] * 1000, 1),
+            "count": len(ordered),
+        }
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        """Return the summary of every stage timed so far."""
+        return {
+            stage: summary
+            for stage in self._samples
+            if (summary := self.stage_summary(stage)) is not None
+        }
+
+
+class RttEstimator:
+    """Smoothed round trip time and its variation, as TCP keeps (RFC 6298).
+
+    The request timeout is the smoothed RTT plus four times its variation,
+    clamped to the configured bounds. Until the first sample, the upper
+    bound is used. Each timeout doubles the next one, up to the upper bound,
+    until a response is timed again.
+    """
+
+    def __init__(self, min_timeout: float, max_timeout: float) -> None:
+        """Initialize with no samples."""
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt: float | None = None
+        self.rttvar: float | None = None
+        self._backoff = 1
+
+    @property
+    def timeout(self) -> float:
+        """Return the timeout for the next request, in seconds."""
+        if self.srtt is None or self.rttvar is None:
+            return self.max_timeout
+        rto = max(self.min_timeout, self.srtt + RTT_K * self.rttvar)
+        return min(self.max_timeout, rto * self._backoff)
+
+    def sample(self, rtt: float) -> None:
+        """Fold in the round trip time of an answered request."""
+        if self.srtt is None or self.rttvar is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += RTT_BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += RTT_ALPHA * (rtt - self.srtt)
+        self._backoff = 1
+
+    def timed_out(self) -> None:
+        """Back off after a request got no answer in time."""
+        if self.timeout < self.max_timeout:
+            self._backoff *= 2
+
+    def as_dict(self) -> dict[str, float | None]:
+        """Return the estimate, in seconds."""
+        return {"srtt": self.srtt, "rttvar": self.rttvar, "timeout": self.timeout}
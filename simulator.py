@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""Local EV-Meter charger fleet and stand-in MQTT broker.
+
+Runs a minimal MQTT 3.1.1 broker on localhost and emulates a fleet of
+chargers behind it. Every charger answers the command payload (PROTOCOL.md 3)
+published on ``/BLEWIFI/Chargers/{charger_id}`` with a synthetic WorkingInfo
+frame (PROTOCOL.md 4.2) on ``/BLEWIFI/users/{user_id}``, after a configurable
+latency and with a configurable drop rate. Chargers move through unplugged,
+waiting and charging states over time, and session energy accumulates while
+they charge.
+
+Nothing leaves the machine, so the integration can be load-tested with
+hundreds of chargers without the real broker, chargers or user ID.
+
+Usage:
+    python simulator.py --chargers 500 --user-id test-user
+    python simulator.py --chargers 500 --load-test 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import struct
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMAND_TOPIC_PREFIX = "/BLEWIFI/Chargers/"
+RESPONSE_TOPIC_TEMPLATE = "/BLEWIFI/users/{user_id}"
+# Bytes 8-9 of every command payload (PROTOCOL.md 3)
+COMMAND_MARKER = b"\x07\x24"
+
+# MQTT 3.1.1 control packet types
+_CONNECT = 1
+_CONNACK = 2
+_PUBLISH = 3
+_PUBACK = 4
+_SUBSCRIBE = 8
+_SUBACK = 9
+_UNSUBSCRIBE = 10
+_UNSUBACK = 11
+_PINGREQ = 12
+_PINGRESP = 13
+_DISCONNECT = 14
+
+# Charger status (PROTOCOL.md 4.3)
+NOT_CONNECTED = 0
+WANTS_TO_CHARGE = 1
+CONNECTED = 2
+
+# Seconds spent in each state before moving on, as (min, max)
+_DWELL = {
+    NOT_CONNECTED: (60.0, 600.0),
+    WANTS_TO_CHARGE: (5.0, 60.0),
+    CONNECTED: (300.0, 3600.0),
+}
+_NEXT_STATE = {
+    NOT_CONNECTED: WANTS_TO_CHARGE,
+    WANTS_TO_CHARGE: CONNECTED,
+    CONNECTED: NOT_CONNECTED,
+}
+# EV status and charging state bytes reported in each charger status
+_EV_STATUS = {NOT_CONNECTED: 0x01, WANTS_TO_CHARGE: 0x03, CONNECTED: 0x02}
+_CHARGING_STATE = {NOT_CONNECTED: 0x01, WANTS_TO_CHARGE: 0x07, CONNECTED: 0x03}
+
+
+def _encode_length(length: int) -> bytes:
+    """Encode an MQTT remaining length."""
+    encoded = bytearray()
+    while True:
+        length, digit = divmod(length, 128)
+        encoded.append(digit | 0x80 if length else digit)
+        if not length:
+            return bytes(encoded)
+
+
+def _packet(packet_type: int, flags: int, body: bytes) -> bytes:
+    """Frame an MQTT control packet."""
+    return bytes((packet_type << 4 | flags,)) + _encode_length(len(body)) + body
+
+
+def _string(value: bytes) -> bytes:
+    """Encode an MQTT length-prefixed string."""
+    return struct.pack("!H", len(value)) + value
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """Return whether a topic matches a subscription filter with wildcards."""
+    filter_levels = topic_filter.split("/")
+    topic_levels = topic.split("/")
+    for index, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+        if index >= len(topic_levels) or level not in ("+", topic_levels[index]):
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+class MqttBroker:
+    """Just enough of an MQTT 3.1.1 broker for the EV-Meter client.
+
+    Supports CONNECT, SUBSCRIBE, UNSUBSCRIBE, PUBLISH at QoS 0 and 1,
+    PINGREQ and DISCONNECT. There is no authentication, retained messages,
+    persistent sessions or QoS 2. Messages are delivered to subscribers at
+    QoS 0.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1883) -> None:
+        """Initialize the broker."""
+        self.host = host
+        self.port = port
+        self.published = 0
+        self._server: asyncio.Server | None = None
+        self._subscriptions: dict[asyncio.StreamWriter, set[str]] = {}
+        self._handlers: list[Callable[[str, bytes], None]] = []
+
+    def add_handler(self, handler: Callable[[str, bytes], None]) -> None:
+        """Call a handler with the topic and payload of every publish."""
+        self._handlers.append(handler)
+
+    async def start(self) -> None:
+        """Start listening; port 0 picks a free port."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        _LOGGER.info("Broker listening on %s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Close every connection and stop listening."""
+        for writer in list(self._subscriptions):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def publish(self, topic: str, payload: bytes) -> None:
+        """Deliver a message to every matching subscriber and handler."""
+        self.published += 1
+        packet = _packet(_PUBLISH, 0, _string(topic.encode()) + payload)
+        for writer, filters in self._subscriptions.items():
+            if any(topic_matches(topic_filter, topic) for topic_filter in filters):
+                writer.write(packet)
+        for handler in self._handlers:
+            handler(topic, payload)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve one client connection until it disconnects."""
+        filters = self._subscriptions[writer] = set()
+        try:
+            while True:
+                header = await reader.readexactly(1)
+                length, multiplier = 0, 1
+                while True:
+                    (digit,) = await reader.readexactly(1)
+                    length += (digit & 0x7F) * multiplier
+                    multiplier *= 128
+                    if not digit & 0x80:
+                        break
+                body = await reader.readexactly(length)
+                packet_type, flags = header[0] >> 4, header[0] & 0x0F
+                if packet_type == _DISCONNECT:
+                    break
+                self._handle_packet(writer, filters, packet_type, flags, body)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self._subscriptions[writer]
+            writer.close()
+
+    def _handle_packet(
+        self,
+        writer: asyncio.StreamWriter,
+        filters: set[str],
+        packet_type: int,
+        flags: int,
+        body: bytes,
+    ) -> None:
+        """Answer one control packet from a client."""
+        if packet_type == _CONNECT:
+            writer.write(_packet(_CONNACK, 0, b"\x00\x00"))
+        elif packet_type == _PUBLISH:
+            qos = flags >> 1 & 0x03
+            (topic_length,) = struct.unpack_from("!H", body)
+            topic = body[2 : 2 + topic_length].decode()
+            offset = 2 + topic_length
+            if qos:
+                writer.write(_packet(_PUBACK, 0, body[offset : offset + 2]))
+                offset += 2
+            self.publish(topic, body[offset:])
+        elif packet_type in (_SUBSCRIBE, _UNSUBSCRIBE):
+            packet_id, offset, granted = body[:2], 2, bytearray()
+            while offset < len(body):
+                (topic_length,) = struct.unpack_from("!H", body, offset)
+                topic_filter = body[offset + 2 : offset + 2 + topic_length].decode()
+                offset += 2 + topic_length
+                if packet_type == _SUBSCRIBE:
+                    filters.add(topic_filter)
+                    granted.append(min(body[offset], 1))
+                    offset += 1
+                else:
+                    filters.discard(topic_filter)
+            if packet_type == _SUBSCRIBE:
+                writer.write(_packet(_SUBACK, 0, packet_id + granted))
+            else:
+                writer.write(_packet(_UNSUBACK, 0, packet_id))
+        elif packet_type == _PINGREQ:
+            writer.write(_packet(_PINGRESP, 0, b""))
+
+
+def build_working_info_frame(
+    *,
+    status: int = 2,
+    evse: int = 1,
+    kubis_version: str = "1.2.3",
+    ev_status: int = 0x02,
+    charging_state: int = 0x03,
+    warnings: int = 0,
+    errors: int = 0,
+    voltages: tuple[int, int, int] = (920, 924, 928),
+    currents: tuple[int, int, int] = (160, 161, 162),
+    session_wh: int = 4200,
+    total_wh: int = 1234567,
+    phase_type: int = 0x02,
+    set_current: int = 16,
+    firmware_version: int = 42,
+    limit: int = 0xFFFFFFFF,
+    wifi_network: str = "garage",
+    grid_type: int = 0x01,
+    mqtt_type: int = 0x01,
+    charger_id: int = 123456,
+    start_time: int = 1700000000000,
+    scheduler_version: int = 3,
+    circuit_breaker: int = 32,
+    dlm_currents: tuple[int, int, int] = (100, 100, 100),
+    temperature: int = 35,
+    peer_serial_number: int = 7,
+    avg_ping_latency: int = 25,
+    trailer: bytes = b"example-user-uuid",
+) -> bytes:
+    """Encode a raw /BLEWIFI/users response carrying a WorkingInfo frame.
+
+    Raw values use the wire units from PROTOCOL.md 4.2 (0.25 V, 0.1 A).
+    """
+    kubis = kubis_version.encode("ascii")
+    wifi = wifi_network.encode("ascii")
+    inner = b"".join(
+        (
+            struct.pack("<BBI", 0x03, status, evse),
+            struct.pack("<H", len(kubis)),
+            kubis,
+            struct.pack("<BBBB", ev_status, charging_state, warnings, errors),
+            struct.pack("<3H", *voltages),
+            struct.pack("<3H", *currents),
+            struct.pack(
+                "<IIBBHI",
+                session_wh,
+                total_wh,
+                phase_type,
+                set_current,
+                firmware_version,
+                limit,
+            ),
+            struct.pack("<H", len(wifi)),
+            wifi,
+            struct.pack(
+                "<BBQQII",
+                grid_type,
+                mqtt_type,
+                charger_id,
+                start_time,
+                scheduler_version,
+                circuit_breaker,
+            ),
+            struct.pack("<3H", *dlm_currents),
+            struct.pack("<BII", temperature, peer_serial_number, avg_ping_latency),
+        )
+    )
+    return struct.pack("<H", len(inner)) + inner + trailer
+
+
+@dataclass
+class SimulatedCharger:
+    """One charger whose state evolves with time."""
+
+    charger_id: int
+    rng: random.Random
+    state: int = NOT_CONNECTED
+    set_current: int = 16
+    phases: int = 3
+    session_wh: float = 0.0
+    total_wh: float = 0.0
+    session_start: float = 0.0
+    changed_at: float = field(default_factory=time.monotonic)
+    dwell: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Start each charger at a random point of its cycle."""
+        self.state = self.rng.choice(tuple(_DWELL))
+        self.dwell = self.rng.uniform(*_DWELL[self.state])
+        self.changed_at -= self.rng.uniform(0, self.dwell)
+        self.total_wh = self.rng.uniform(0, 5_000_000)
+
+    @property
+    def power_w(self) -> float:
+        """Return the power drawn in the current state."""
+        if self.state != CONNECTED:
+            return 0.0
+        return 230.0 * self.set_current * self.phases
+
+    def advance(self, now: float) -> None:
+        """Move through states and accumulate energy up to ``now``."""
+        while True:
+            state_end = self.changed_at + self.dwell
+            until = min(now, state_end)
+            energy = self.power_w * max(until - self.changed_at, 0.0) / 3600.0
+            self.session_wh += energy
+            self.total_wh += energy
+            if now < state_end:
+                # Energy up to now is counted; the rest of the dwell remains
+                self.changed_at, self.dwell = now, state_end - now
+                return
+            self.state = _NEXT_STATE[self.state]
+            self.changed_at, self.dwell = state_end, self.rng.uniform(
+                *_DWELL[self.state]
+            )
+            if self.state == WANTS_TO_CHARGE:
+                self.session_wh = 0.0
+                self.session_start = time.time() - (now - state_end)
+
+    def _per_phase(self, value: Callable[[], int]) -> tuple[int, int, int]:
+        """Return a reading for each wired phase and zero for the others."""
+        first, second, third = (
+            value() if phase < self.phases else 0 for phase in range(3)
+        )
+        return first, second, third
+
+    def frame(self, user_id: str) -> bytes:
+        """Encode the charger's current state as a raw WorkingInfo response."""
+        self.advance(time.monotonic())
+        charging = self.state == CONNECTED
+        current = self.set_current * 10 if charging else 0
+        currents = self._per_phase(lambda: current)
+        voltages = self._per_phase(lambda: round(self.rng.gauss(230.0, 1.5) * 4))
+        return build_working_info_frame(
+            status=self.state,
+            kubis_version="1.4.2",
+            ev_status=_EV_STATUS[self.state],
+            charging_state=_CHARGING_STATE[self.state],
+            voltages=voltages,
+            currents=currents,
+            session_wh=int(self.session_wh),
+            total_wh=int(self.total_wh),
+            phase_type=0x02 if self.phases == 3 else 0x01,
+            set_current=self.set_current,
+            wifi_network=f"sim-{self.charger_id % 100:02d}",
+            charger_id=self.charger_id,
+            start_time=int(self.session_start * 1000),
+            dlm_currents=(320, 320, 320),
+            temperature=self.rng.randint(25, 45),
+            peer_serial_number=0,
+            avg_ping_latency=self.rng.randint(10, 80),
+            trailer=user_id.encode("ascii"),
+        )
+
+
+class ChargerFleet:
+    """Simulated chargers answering commands published through a broker."""
+
+    def __init__(
+        self,
+        broker: MqttBroker,
+        user_id: str,
+        chargers: int,
+        *,
+        first_id: int = 100000,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        drop_rate: float = 0.0,
+        push_interval: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the fleet and hook it up to the broker."""
+        self.broker = broker
+        self.user_id = user_id
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.push_interval = push_interval
+        self.commands = 0
+        self.dropped = 0
+        self._rng = random.Random(seed)
+        # Keyed by charger ID, the 12 hex digits of the Charger ID field
+        self.chargers = {
+            f"{charger_id:012X}": SimulatedCharger(
+                charger_id, random.Random(charger_id)
+            )
+            for charger_id in range(first_id, first_id + chargers)
+        }
+        self._response_topic = RESPONSE_TOPIC_TEMPLATE.format(user_id=user_id)
+        self._push_task: asyncio.Task | None = None
+        broker.add_handler(self._handle_publish)
+
+    def start(self) -> None:
+        """Start publishing unsolicited frames, if a push interval is set."""
+        if self.push_interval > 0:
+            self._push_task = asyncio.create_task(self._push())
+
+    async def stop(self) -> None:
+        """Stop publishing unsolicited frames."""
+        if self._push_task is not None:
+            self._push_task.cancel()
+            await asyncio.gather(self._push_task, return_exceptions=True)
+            self._push_task = None
+
+    def _handle_publish(self, topic: str, payload: bytes) -> None:
+        """Schedule a response to a command for one of the chargers."""
+        if not topic.startswith(COMMAND_TOPIC_PREFIX) or payload[8:10] != (
+            COMMAND_MARKER
+        ):
+            return
+        charger = self.chargers.get(topic[len(COMMAND_TOPIC_PREFIX) :])
+        if charger is None:
+            return
+        self.commands += 1
+        if self._rng.random() < self.drop_rate:
+            self.dropped += 1
+            return
+        delay = max(self.latency + self._rng.uniform(-self.jitter, self.jitter), 0)
+        asyncio.get_running_loop().call_later(delay, self._respond, charger)
+
+    def _respond(self, charger: SimulatedCharger) -> None:
+        """Publish a charger's WorkingInfo frame on the user topic."""
+        self.broker.publish(self._response_topic, charger.frame(self.user_id))
+
+    async def _push(self) -> None:
+        """Publish every charger's frame once per push interval, spread out."""
+        while True:
+            pause = self.push_interval / max(len(self.chargers), 1)
+            for charger in self.chargers.values():
+                self._respond(charger)
+                await asyncio.sleep(pause)
+
+
+async def load_test(broker: MqttBroker, fleet: ChargerFleet, rounds: int) -> None:
+    """Fetch every charger concurrently through one pooled integration client."""
+    # Imported here so the simulator itself runs without Home Assistant
+    from evmeter_client import EVMeterConfig  # pylint: disable=import-outside-toplevel
+
+    from custom_components.evmeter.api import (  # pylint: disable=import-outside-toplevel
+        EVMeterApiClient,
+    )
+
+    client = EVMeterApiClient(
+        EVMeterConfig(
+            mqtt_host=broker.host, mqtt_port=broker.port, user_id=fleet.user_id
+        )
+    )
+    client.async_start()
+    try:
+        await client.async_wait_connected(10)
+        for round_number in range(1, rounds + 1):
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(client.get_charger_snapshot(cid) for cid in fleet.chargers),
+                return_exceptions=True,
+            )
+            elapsed = time.perf_counter() - start
+            failed = sum(isinstance(result, Exception) for result in results)
+            print(
+                f"Round {round_number}: {len(results) - failed}/{len(results)} "
+                f"chargers in {elapsed:.2f}s"
+            )
+    finally:
+        await client.async_stop()
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the broker and fleet until interrupted or the load test ends."""
+    broker = MqttBroker(args.host, args.port)
+    await broker.start()
+    fleet = ChargerFleet(
+        broker,
+        args.user_id,
+        args.chargers,
+        first_id=args.first_id,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        push_interval=args.push_interval,
+        seed=args.seed,
+    )
+    fleet.start()
+    print(
+        f"Simulating {args.chargers} chargers ({args.first_id:012X}-"
+        f"{args.first_id + args.chargers - 1:012X}) for user {args.user_id!r} "
+        f"on {broker.host}:{broker.port}"
+    )
+    try:
+        if args.load_test:
+            await load_test(broker, fleet, args.load_test)
+        else:
+            while True:
+                await asyncio.sleep(10)
+                print(
+                    f"Commands: {fleet.commands}, dropped: {fleet.dropped}, "
+                    f"published: {broker.published}"
+                )
+    finally:
+        await fleet.stop()
+        await broker.stop()
+
+
+def main() -> None:
+    """Parse arguments and run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883, help="0 picks a free port")
+    parser.add_argument("--user-id", default="test-user")
+    parser.add_argument("--chargers", type=int, default=10)
+    parser.add_argument("--first-id", type=int, default=100000)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="mean response delay in seconds"
+    )
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument(
+        "--drop-rate", type=float, default=0.0, help="share of commands ignored"
+    )
+    parser.add_argument(
+        "--push-interval",
+        type=float,
+        default=0.0,
+        help="seconds between unsolicited frames per charger, 0 to disable",
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--load-test",
+        type=int,
+        default=0,
+        metavar="ROUNDS",
+        help="fetch every charger through the integration client ROUNDS times",
+    )
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
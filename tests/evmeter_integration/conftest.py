@@ -0,0 +1,11 @@
+"""Shared fixtures for the evmeter integration tests."""
+
+import pytest
+
+from simulator import build_working_info_frame
+
+
+@pytest.fixture
+def working_info_frame():
+    """Return the WorkingInfo frame builder."""
+    return build_working_info_frame
@@ -0,0 +1,464 @@
+"""Test the integration-side EV-Meter client extensions."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import cast
+
+import aiomqtt
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from evmeter_client import EVMeterClient, EVMeterConfig  # noqa: E402
+from evmeter_client.exceptions import EVMeterError, EVMeterTimeoutError  # noqa: E402
+from evmeter_client.parser import parse_blewifi_payload  # noqa: E402
+
+from custom_components.evmeter.api import (  # noqa: E402
+    ConnectionState,
+    EVMeterApiClient,
+    correlation_key,
+    response_charger_id,
+)
+from custom_components.evmeter.const import FRAME_KEY_CONFIRMATIONS  # noqa: E402
+from custom_components.evmeter.timing import RttEstimator, StageTimings  # noqa: E402
+
+
+async def test_snapshot_matches_separate_fetches(working_info_frame, monkeypatch):
+    """Test one snapshot round trip yields the same models as two fetches."""
+    response = parse_blewifi_payload(working_info_frame())
+    sent: list[str] = []
+
+    async def fake_send_command(charger_id, command_payload, timeout=None):
+        sent.append(charger_id)
+        return response
+
+    legacy = EVMeterClient(EVMeterConfig(user_id="test-user"))
+    legacy._send_command = fake_send_command
+    expected_status = await legacy.get_charger_status("123456")
+    expected_metrics = await legacy.get_charger_metrics("123456")
+    assert len(sent) == 2
+
+    sent.clear()
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    monkeypatch.setattr(client, "_send_command", fake_send_command)
+    snapshot = await client.get_charger_snapshot("123456")
+
+    assert sent == ["123456"]
+    assert snapshot.status == expected_status
+    assert snapshot.metrics == expected_metrics
+
+
+async def test_unsolicited_frames_go_to_their_chargers_listener(working_info_frame):
+    """Test frames resolve pending requests first, then reach one listener."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    pushed: list[dict] = []
+    others: list[dict] = []
+    remove_listener = client.add_frame_listener("00000009FBF1", pushed.append)
+    client.add_frame_listener("00000001E240", others.append)
+    client.add_frame_listener("EXAMPLE123456", others.append)
+
+    future = asyncio.get_running_loop().create_future()
+    client._pending_requests["00000001E240"] = [future]
+    client._handle_payload(working_info_frame(charger_id=123456))
+    assert future.result()["working_info"]["id"] == 123456
+
+    client._handle_payload(working_info_frame(charger_id=654321))
+    client._handle_payload(working_info_frame(charger_id=999))
+    assert [response_charger_id(response) for response in pushed] == ["654321"]
+    assert others == []
+
+    remove_listener()
+    client._handle_payload(working_info_frame(charger_id=654321))
+    assert len(pushed) == 1
+
+
+async def settle() -> None:
+    """Let scheduled request tasks run up to their first wait."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+class FakeMqttClient:
+    """Record publishes instead of sending them to a broker."""
+
+    def __init__(self) -> None:
+        self.published: list[str] = []
+
+    async def publish(self, topic, payload=None, qos=0):
+        self.published.append(topic)
+
+
+def fake_mqtt(client: EVMeterApiClient) -> FakeMqttClient:
+    """Put a FakeMqttClient in place of the client's broker connection."""
+    mqtt = FakeMqttClient()
+    client._client = cast(aiomqtt.Client, mqtt)
+    return mqtt
+
+
+async def test_concurrent_requests_correlated_by_charger_id(working_info_frame):
+    """Test in-flight requests each resolve with their own charger's frame."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    mqtt = fake_mqtt(client)
+
+    first = asyncio.create_task(client.get_charger_snapshot("7C9EBD4757CE"))
+    second = asyncio.create_task(client.get_charger_snapshot("7c9ebd4757cf"))
+    await settle()
+    assert len(mqtt.published) == 2
+
+    # Responses arrive out of order on the shared user topic
+    client._handle_payload(
+        working_info_frame(charger_id=0x7C9EBD4757CF, set_current=22)
+    )
+    client._handle_payload(
+        working_info_frame(charger_id=0x7C9EBD4757CE, set_current=11)
+    )
+
+    assert (await first).status.set_current == 11
+    assert (await second).status.set_current == 22
+    assert client._pending_requests == {}
+
+
+def test_charger_ids_map_to_the_frame_field():
+    """Test documented charger IDs are read as hex, and others are not guessed."""
+    assert correlation_key("7C9EBD4757CE") == str(0x7C9EBD4757CE)
+    assert correlation_key("123456789012") == str(0x123456789012)
+    assert correlation_key("EXAMPLE123456") is None
+    assert correlation_key("111") is None
+    assert correlation_key("0x9EBD4757CE") is None
+
+
+async def unanswered(client, charger_id, *frames):
+    """Time out one request for a charger while the given frames arrive."""
+    request = asyncio.create_task(client.get_charger_snapshot(charger_id, timeout=0.05))
+    await settle()
+    for frame in frames:
+        client._handle_payload(frame)
+    with pytest.raises(EVMeterTimeoutError):
+        await request
+
+
+async def answered(client, charger_id, frame):
+    """Return the snapshot of one request for a charger that the frame answers."""
+    request = asyncio.create_task(client.get_charger_snapshot(charger_id, timeout=1))
+    await settle()
+    client._handle_payload(frame)
+    return await request
+
+
+async def test_unclaimed_frame_answers_the_learning_charger(working_info_frame):
+    """Test a charger in another ID format is answered, then mapped once sure."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+    frame = working_info_frame(charger_id=555, set_current=11)
+
+    for _ in range(FRAME_KEY_CONFIRMATIONS - 1):
+        snapshot = await answered(client, "EXAMPLE123456", frame)
+        assert snapshot.status.set_current == 11
+        assert client.frame_key("EXAMPLE123456") is None
+    await answered(client, "EXAMPLE123456", frame)
+    assert client.frame_key("EXAMPLE123456") == "555"
+
+    # Once mapped, another charger's frame no longer answers it
+    await unanswered(client, "EXAMPLE123456", working_info_frame(charger_id=999))
+
+
+async def test_learning_charger_keeps_to_its_first_field(working_info_frame):
+    """Test a push that answered first is dropped once it proves wrong."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+    push = working_info_frame(charger_id=999, session_wh=1)
+    frame = working_info_frame(charger_id=555)
+
+    assert (
+        await answered(client, "EXAMPLE123456", push)
+    ).metrics.session_energy_wh == 1
+    # The charger's real answer is not taken while the push's field is tried
+    await unanswered(client, "EXAMPLE123456", frame)
+    for _ in range(FRAME_KEY_CONFIRMATIONS):
+        await answered(client, "EXAMPLE123456", frame)
+    assert client.frame_key("EXAMPLE123456") == "555"
+
+    # A field that also arrives while the charger is not asked is not learned
+    for _ in range(FRAME_KEY_CONFIRMATIONS):
+        await answered(client, "EXAMPLE654321", push)
+        client._handle_payload(push)
+    assert client.frame_key("EXAMPLE654321") is None
+
+
+async def test_unanswered_charger_field_is_learned_again(working_info_frame):
+    """Test a hex ID that never matches its answers falls back to learning."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+    frame = working_info_frame(charger_id=555, set_current=11)
+
+    # An offline charger keeps its field
+    for _ in range(FRAME_KEY_CONFIRMATIONS):
+        await unanswered(client, "7C9EBD4757CE")
+    assert client.frame_key("7C9EBD4757CE") == correlation_key("7C9EBD4757CE")
+
+    for _ in range(FRAME_KEY_CONFIRMATIONS):
+        await unanswered(client, "7C9EBD4757CE", frame)
+    assert client.frame_key("7C9EBD4757CE") is None
+    for _ in range(FRAME_KEY_CONFIRMATIONS):
+        await answered(client, "7C9EBD4757CE", frame)
+    assert client.frame_key("7C9EBD4757CE") == "555"
+
+
+class FleetMqttClient:
+    """Answer each published command with the frame of the charger asked."""
+
+    def __init__(self, client: EVMeterApiClient, frames: dict[str, bytes]) -> None:
+        self._client = client
+        self._frames = frames
+
+    async def publish(self, topic, payload=None, qos=0):
+        frame = self._frames[topic.rsplit("/", 1)[-1]]
+        asyncio.get_running_loop().call_later(0.01, self._client._handle_payload, frame)
+
+
+async def test_fleet_of_unmapped_chargers_polled_together(working_info_frame):
+    """Test chargers in another ID format polled concurrently all get answers."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    frames = {
+        f"EXAMPLE{index}": working_info_frame(charger_id=500 + index, set_current=index)
+        for index in range(3)
+    }
+    client._client = cast(aiomqtt.Client, FleetMqttClient(client, frames))
+
+    for _ in range(FRAME_KEY_CONFIRMATIONS + 1):
+        snapshots = await asyncio.gather(
+            *(client.get_charger_snapshot(charger_id) for charger_id in frames)
+        )
+        assert [snapshot.status.set_current for snapshot in snapshots] == [0, 1, 2]
+    assert [client.frame_key(charger_id) for charger_id in frames] == [
+        "500",
+        "501",
+        "502",
+    ]
+
+
+async def test_unmapped_chargers_wait_their_turn_within_the_timeout():
+    """Test the wait for a turn to ask an unmapped charger is part of its timeout."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+
+    start = asyncio.get_running_loop().time()
+    results = await asyncio.gather(
+        *(
+            client.get_charger_snapshot(f"EXAMPLE{index}", timeout=0.1)
+            for index in range(5)
+        ),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, EVMeterTimeoutError) for result in results)
+    assert asyncio.get_running_loop().time() - start < 0.3
+
+
+async def test_timed_out_request_is_forgotten():
+    """Test a request that times out leaves nothing pending."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user", response_timeout=0))
+    fake_mqtt(client)
+
+    with pytest.raises(EVMeterTimeoutError):
+        await client.get_charger_snapshot("111")
+    assert client._pending_requests == {}
+
+
+async def test_connection_state_machine(monkeypatch):
+    """Test failed connects back off and a dropped connection reconnects."""
+    monkeypatch.setattr("custom_components.evmeter.api._backoff_delay", lambda n: 0)
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    attempts: list[int] = []
+
+    async def fake_connect():
+        attempts.append(len(attempts))
+        if len(attempts) < 3:
+            raise EVMeterError("MQTT connection failed")
+        fake_mqtt(client)
+
+    async def fake_disconnect():
+        client._client = None
+
+    monkeypatch.setattr(client, "connect", fake_connect)
+    monkeypatch.setattr(client, "disconnect", fake_disconnect)
+
+    await client.async_wait_connected(1)
+    assert client.connection_state is ConnectionState.CONNECTED
+    assert len(attempts) == 3
+
+    client._connection_lost.set()
+    await asyncio.sleep(0)
+    await client.async_wait_connected(1)
+    assert client.reconnects == 1
+    assert len(attempts) == 4
+
+    await client.async_stop()
+    assert client.connection_state is ConnectionState.DISCONNECTED
+
+
+async def test_close_stops_the_message_handler():
+    """Test closing the connection cancels and awaits its message handler."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+
+    async def quiet():
+        await asyncio.Event().wait()
+        yield
+
+    client._client = cast(aiomqtt.Client, SimpleNamespace(messages=quiet()))
+    handler = client._message_task = asyncio.create_task(client._message_handler())
+    await settle()
+
+    await client._async_close()
+    assert handler.cancelled()
+    assert client._message_task is None
+    assert client._client is None
+
+
+async def test_command_payload_built_once(monkeypatch):
+    """Test each charger's command is encoded once and then reused."""
+    built: list[str] = []
+    create_payload = EVMeterClient._create_command_payload
+
+    def counting_create_payload(self, charger_id):
+        built.append(charger_id)
+        return create_payload(self, charger_id)
+
+    monkeypatch.setattr(
+        EVMeterClient, "_create_command_payload", counting_create_payload
+    )
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    payload = client._create_command_payload("111")
+
+    assert client._create_command_payload("111") is payload
+    assert client._command("111").topic == "/BLEWIFI/Chargers/111"
+    client._create_command_payload("222")
+    assert built == ["111", "222"]
+
+
+async def test_concurrent_requests_for_one_charger_share_a_round_trip(
+    working_info_frame,
+):
+    """Test overlapping requests for a charger publish once and share the frame."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    mqtt = fake_mqtt(client)
+
+    requests = [
+        asyncio.create_task(client.get_charger_snapshot("00000000006F"))
+        for _ in range(3)
+    ]
+    await settle()
+    assert mqtt.published == ["/BLEWIFI/Chargers/00000000006F"]
+
+    client._handle_payload(working_info_frame(charger_id=111, set_current=11))
+    snapshots = await asyncio.gather(*requests)
+    assert [snapshot.status.set_current for snapshot in snapshots] == [11, 11, 11]
+    assert client._in_flight == {}
+
+    # The next request is a new round trip
+    request = asyncio.create_task(client.get_charger_snapshot("00000000006F"))
+    await settle()
+    assert len(mqtt.published) == 2
+    client._handle_payload(working_info_frame(charger_id=111))
+    await request
+
+
+async def test_round_trip_stages_are_timed(working_info_frame):
+    """Test a snapshot carries the time spent in each request stage."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+
+    request = asyncio.create_task(client.get_charger_snapshot("00000000006F"))
+    await settle()
+    await asyncio.sleep(0.01)
+    client._handle_payload(working_info_frame(charger_id=111))
+    snapshot = await request
+
+    assert set(snapshot.timings) == {"publish", "first_byte", "decode"}
+    assert snapshot.timings["first_byte"] >= 0.01
+    assert client._arrivals == {}
+
+
+def test_stage_timings_summary():
+    """Test the rolling figures cover only the latest samples."""
+    timings = StageTimings(window=100)
+    for ms in range(200):
+        timings.record("publish", ms / 1000)
+
+    assert timings.summary() == {
+        "publish": {"p50": 150.0, "p95": 194.0, "max": 199.0, "count": 100}
+    }
+
+
+def test_rtt_estimator_follows_round_trips():
+    """Test the timeout tracks the smoothed RTT and backs off on timeouts."""
+    estimator = RttEstimator(min_timeout=0.5, max_timeout=10)
+    assert estimator.timeout == 10
+
+    estimator.sample(0.4)
+    # 0.4 + 4 * 0.2
+    assert estimator.timeout == pytest.approx(1.2)
+    estimator.sample(0.4)
+    assert estimator.srtt == pytest.approx(0.4)
+    assert estimator.rttvar == pytest.approx(0.15)
+    assert estimator.timeout == pytest.approx(1.0)
+
+    estimator.timed_out()
+    estimator.timed_out()
+    assert estimator.timeout == pytest.approx(4.0)
+    for _ in range(5):
+        estimator.timed_out()
+    assert estimator.timeout == 10
+
+    estimator.sample(0.4)
+    assert estimator.timeout < 1.0
+
+
+async def test_request_timeout_adapts_per_charger(working_info_frame):
+    """Test a charger that answered quickly times out sooner than the bound."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+    client.set_timeout_bounds("00000000006F", 0.05, 10)
+
+    request = asyncio.create_task(client.get_charger_snapshot("00000000006F"))
+    await settle()
+    client._handle_payload(working_info_frame(charger_id=111))
+    await request
+    assert client.rtt_estimator("00000000006F").timeout == 0.05
+
+    with pytest.raises(EVMeterTimeoutError):
+        await client.get_charger_snapshot("00000000006F")
+    assert client.rtt_estimator("00000000006F").timeout == 0.1
+
+
+async def test_probe_timeout_does_not_back_off(working_info_frame):
+    """Test a request with its own timeout leaves the charger's timeout alone."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+    client.set_timeout_bounds("00000000006F", 0.05, 10)
+
+    request = asyncio.create_task(client.get_charger_snapshot("00000000006F"))
+    await settle()
+    client._handle_payload(working_info_frame(charger_id=111))
+    await request
+
+    with pytest.raises(EVMeterTimeoutError):
+        await client.get_charger_snapshot("00000000006F", timeout=0.01)
+    assert client.rtt_estimator("00000000006F").timeout == 0.05
+    assert "00000000006F" not in client._pending_requests
+
+
+async def test_unmatched_frames_resolve_no_request(working_info_frame):
+    """Test another charger's frame is pushed instead of answering a request."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    fake_mqtt(client)
+    pushed: list[dict] = []
+    client.add_frame_listener("00000009FBF1", pushed.append)
+
+    request = asyncio.create_task(client.get_charger_snapshot("7C9EBD4757CE"))
+    await settle()
+    client._handle_payload(working_info_frame(charger_id=654321))
+
+    assert not request.done()
+    assert [response_charger_id(response) for response in pushed] == ["654321"]
+    client._handle_payload(working_info_frame(charger_id=0x7C9EBD4757CE))
+    await request
@@ -0,0 +1,55 @@
+"""Test the vectorized bulk decoder against the per-frame decoder."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("homeassistant")
+
+from bulk_decode import decode_frames, read_capture  # noqa: E402
+
+from custom_components.evmeter.decoder import decode_response  # noqa: E402
+
+
+def test_mixed_layouts_match_decode_response(working_info_frame):
+    """Test frames of different string lengths decode like decode_response."""
+    frames = [
+        working_info_frame(charger_id=1, kubis_version="1.2.3"),
+        working_info_frame(charger_id=2, wifi_network="a-much-longer-ssid"),
+        working_info_frame(charger_id=3)[:40],
+        working_info_frame(charger_id=4, kubis_version="", limit=16),
+        working_info_frame(charger_id=5, currents=(321, 0, 7)),
+    ]
+    columns = decode_frames(frames)
+
+    assert columns["valid"].tolist() == [True, True, False, True, True]
+    for row, frame in enumerate(frames):
+        if not columns["valid"][row]:
+            continue
+        info = decode_response(frame)["working_info"]
+        assert columns["charger_id"][row] == info["id"]
+        assert columns["voltage_ph2"][row] == pytest.approx(info["voltagePh2"])
+        assert columns["current_ph1"][row] == pytest.approx(info["currentPh1"])
+        assert columns["dlm_current_ph3"][row] == pytest.approx(info["dlmCurrentPh3"])
+        assert columns["avg_ping_latency"][row] == info["avgPingLatency"]
+        assert columns["kubis_version"][row].decode() == info["kubisVersion"]
+        assert columns["wifi_network"][row].decode() == info["wifi"]
+        assert columns["unlimited"][row] == (info["limit"] == "UNLIMITED")
+
+
+def test_read_capture_skips_comments(working_info_frame):
+    """Test capture files are read as one hex frame per line."""
+    frame = working_info_frame()
+    assert read_capture(["# capture", "", frame.hex() + "\n"]) == [frame]
+
+
+def test_read_capture_accepts_inner_payloads(working_info_frame):
+    """Test lines without the length header, as analyze_response.py prints them."""
+    frame = working_info_frame(charger_id=7)
+    length = int.from_bytes(frame[:2], "little")
+    inner = frame[2 : 2 + length]
+
+    frames = read_capture([inner.hex(), frame.hex()])
+    assert frames == [frame[: 2 + length], frame]
+    columns = decode_frames(frames)
+    assert columns["valid"].tolist() == [True, True]
+    assert columns["charger_id"].tolist() == [7, 7]
@@ -2,6 +2,8 @@
 
 import json
 import os
+from types import SimpleNamespace
+from typing import cast
 
 import pytest
 
@@ -56,6 +58,8 @@ def test_manifest_requirements():
     assert manifest["domain"] == "evmeter"
     assert manifest["name"] == "EV-Meter"
     assert "version" in manifest
+    # A fleet entry owns many charger devices
+    assert manifest["integration_type"] == "hub"
 
 
 def test_integration_structure():
@@ -124,7 +128,172 @@ def test_config_flow_imports():
         config_flow_content = f.read()
 
     # Check that evmeter-client imports are present
-    assert (
-        "from evmeter_client import EVMeterClient, EVMeterConfig" in config_flow_content
-    )
+    assert "from evmeter_client import EVMeterConfig" in config_flow_content
     assert "from evmeter_client.exceptions import EVMeterError" in config_flow_content
+
+
+def test_parse_charger_ids():
+    """Test charger ID lists and pasted CSV are read in order without repeats."""
+    pytest.importorskip("homeassistant")
+    from custom_components.evmeter.config_flow import parse_charger_ids
+
+    assert parse_charger_ids("111, 222\n333;111\n\n") == ["111", "222", "333"]
+    assert parse_charger_ids("site,charger_id\nNorth,111\nSouth,222\n") == [
+        "111",
+        "222",
+    ]
+
+
+@pytest.fixture
+async def flow(tmp_path):
+    """Return a user-started config flow on a bare Home Assistant instance."""
+    pytest.importorskip("homeassistant")
+    from homeassistant.config_entries import ConfigEntries
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.evmeter import config_flow
+
+    hass = HomeAssistant(str(tmp_path))
+    hass.config_entries = ConfigEntries(hass, {})
+    flow = config_flow.ConfigFlow()
+    flow.hass = hass
+    flow.handler = "evmeter"
+    flow.flow_id = "flow"
+    flow.context = {"source": "user"}
+    yield flow
+    await hass.async_stop(force=True)
+
+
+async def test_fleet_batch_joins_existing_fleet(flow, monkeypatch):
+    """Test a second batch for a user is added to that user's fleet entry."""
+    from homeassistant.config_entries import ConfigEntry
+    from homeassistant.data_entry_flow import FlowResultType
+
+    from custom_components.evmeter import config_flow
+
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain="evmeter",
+        title="EV-Meter Fleet (1 chargers)",
+        data={"user_id": "user-a", "charger_ids": ["7C9EBD4757CE"]},
+        source="user",
+        unique_id="fleet_user-a",
+    )
+    flow.hass.config_entries._entries[entry.entry_id] = entry
+    validated: list[list[str]] = []
+
+    async def validate(hass, user_id, charger_ids):
+        validated.append(charger_ids)
+        return {"title": "EV-Meter Fleet"}
+
+    monkeypatch.setattr(config_flow, "validate_fleet_input", validate)
+
+    result = await flow.async_step_fleet(
+        {"user_id": "user-a", "charger_ids": "7C9EBD4757CE, 7C9EBD4757CF"}
+    )
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "fleet_updated"
+    assert validated == [["7C9EBD4757CF"]]
+    assert entry.data["charger_ids"] == ["7C9EBD4757CE", "7C9EBD4757CF"]
+    assert entry.title == "EV-Meter Fleet (2 chargers)"
+
+
+async def test_charger_step_accepts_ids_that_can_be_polled(flow, monkeypatch):
+    """Test pollable IDs in any format are set up and one breaking the topic is not."""
+    from homeassistant.data_entry_flow import FlowResultType
+
+    from custom_components.evmeter import config_flow
+
+    async def validate(hass, data):
+        return {"title": f"EV-Meter Charger {data['charger_id']}"}
+
+    monkeypatch.setattr(config_flow, "validate_input", validate)
+
+    for charger_id in ("7C9E/BD4757CE", "7C9E BD47", "site#1"):
+        result = await flow.async_step_charger(
+            {"charger_id": charger_id, "user_id": "user-a"}
+        )
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"charger_id": "invalid_charger_id"}
+
+    for charger_id in ("7C9EBD4757CE", "EXAMPLE123456"):
+        result = await flow.async_step_charger(
+            {"charger_id": charger_id, "user_id": "user-a"}
+        )
+        assert result["type"] == FlowResultType.CREATE_ENTRY
+        assert result["data"]["charger_id"] == charger_id
+
+
+async def test_probe_answered_in_any_id_format(working_info_frame):
+    """Test the setup probe is answered for README-style and other charger IDs."""
+    pytest.importorskip("homeassistant")
+    import asyncio
+
+    import aiomqtt
+    from evmeter_client import EVMeterConfig
+
+    from custom_components.evmeter import config_flow
+    from custom_components.evmeter.api import EVMeterApiClient
+
+    client = EVMeterApiClient(EVMeterConfig(user_id="user-a"))
+    frame = working_info_frame(charger_id=0x7C9EBD4757CE)
+
+    async def publish(topic, payload=None, qos=0):
+        asyncio.get_running_loop().call_soon(client._handle_payload, frame)
+
+    client._client = cast(aiomqtt.Client, SimpleNamespace(publish=publish))
+
+    assert await config_flow._async_probe(client, "7C9EBD4757CE")
+    frame = working_info_frame(charger_id=555)
+    assert await config_flow._async_probe(client, "EXAMPLE123456")
+
+
+async def test_fleet_step_names_invalid_charger_ids(flow, monkeypatch):
+    """Test a fleet batch with unpollable IDs is rejected, naming them."""
+    from custom_components.evmeter import config_flow
+
+    validated: list[list[str]] = []
+
+    async def validate(hass, user_id, charger_ids):
+        validated.append(charger_ids)
+        return {"title": "EV-Meter Fleet"}
+
+    monkeypatch.setattr(config_flow, "validate_fleet_input", validate)
+
+    result = await flow.async_step_fleet(
+        {
+            "user_id": "user-a",
+            "charger_ids": "7C9EBD4757CE\n7C9E BD47 57CF\nEXAMPLE1\nsite/3",
+        }
+    )
+
+    assert result["errors"] == {"charger_ids": "invalid_charger_ids"}
+    assert result["description_placeholders"] == {
+        "invalid_ids": "7C9E BD47 57CF, site/3"
+    }
+    assert validated == []
+
+
+async def test_options_reject_min_timeout_above_max():
+    """Test the options form refuses a minimum request timeout above the maximum."""
+    pytest.importorskip("homeassistant")
+    from homeassistant.data_entry_flow import FlowResultType
+
+    from custom_components.evmeter import config_flow
+
+    flow = config_flow.OptionsFlowHandler(SimpleNamespace(options={}))
+    flow.handler = "entry"
+    flow.flow_id = "flow"
+
+    result = await flow.async_step_init(
+        {"min_request_timeout": 20.0, "max_request_timeout": 5.0}
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"min_request_timeout": "min_timeout_above_max"}
+
+    result = await flow.async_step_init(
+        {"min_request_timeout": 5.0, "max_request_timeout": 5.0}
+    )
+    assert result["type"] == FlowResultType.CREATE_ENTRY
@@ -0,0 +1,343 @@
+"""Test the EV-Meter data update coordinator."""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import cast
+
+import aiomqtt
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from evmeter_client import EVMeterConfig  # noqa: E402
+from evmeter_client.exceptions import EVMeterTimeoutError  # noqa: E402
+from evmeter_client.parser import parse_blewifi_payload  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.evmeter.api import (  # noqa: E402
+    ConnectionState,
+    EVMeterApiClient,
+    correlation_key,
+    snapshot_from_response,
+)
+from custom_components.evmeter import coordinator as coordinator_module  # noqa: E402
+from custom_components.evmeter.coordinator import EVMeterCoordinator  # noqa: E402
+from custom_components.evmeter.fleet import EVMeterFleet  # noqa: E402
+from custom_components.evmeter import storage  # noqa: E402
+from custom_components.evmeter.storage import EVMeterSnapshotStore  # noqa: E402
+from custom_components.evmeter.timing import StageTimings  # noqa: E402
+
+
+class FakeClient:
+    """Serve a canned snapshot, or fail while the charger is unreachable."""
+
+    def __init__(self, frame: bytes) -> None:
+        self.config = SimpleNamespace(user_id="test-user", response_timeout=10)
+        self.reachable = True
+        self.timings = StageTimings()
+        self.frame_keys: dict[str, str] = {}
+        self._response = parse_blewifi_payload(frame)
+
+    async def async_wait_connected(self, timeout):
+        pass
+
+    def set_timeout_bounds(self, charger_id, min_timeout, max_timeout):
+        pass
+
+    def add_frame_listener(self, charger_id, listener):
+        return lambda: None
+
+    def frame_key(self, charger_id):
+        return self.frame_keys.get(charger_id, correlation_key(charger_id))
+
+    async def get_charger_snapshot(self, charger_id):
+        if not self.reachable:
+            raise EVMeterTimeoutError("charger offline")
+        return snapshot_from_response(charger_id, self._response)
+
+
+def api(client: FakeClient) -> EVMeterApiClient:
+    """Return the fake as the client the coordinator is typed to take."""
+    return cast(EVMeterApiClient, client)
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Return a bare Home Assistant instance."""
+    hass = HomeAssistant(str(tmp_path))
+    yield hass
+    await hass.async_stop(force=True)
+
+
+async def test_stale_snapshot_served_within_grace(
+    hass, working_info_frame, monkeypatch
+):
+    """Test a failed refresh keeps the last data until the grace window ends."""
+    client = FakeClient(working_info_frame())
+    coordinator = EVMeterCoordinator(hass, api(client), "123456", {"stale_grace": 60})
+    updates: list[None] = []
+    coordinator.async_add_listener(lambda: updates.append(None))
+
+    await coordinator.async_refresh()
+    data = coordinator.data
+    assert len(updates) == 1
+
+    client.reachable = False
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.data is data
+    assert len(updates) == 1
+    assert coordinator.update_interval == timedelta(seconds=10)
+
+    later = data["received_at"] + timedelta(seconds=61)
+    monkeypatch.setattr(dt_util, "utcnow", lambda: later)
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert len(updates) == 2
+
+
+async def test_stale_retry_is_used_once(hass, working_info_frame, monkeypatch):
+    """Test failures only poll quickly once, then at the regular interval."""
+    # Keep the circuit breaker out of the way
+    monkeypatch.setattr("custom_components.evmeter.breaker.BREAKER_TIMEOUTS", 10)
+    # No EV connected, so the regular interval is the unplugged one
+    client = FakeClient(working_info_frame(status=0, ev_status=1, charging_state=1))
+    coordinator = EVMeterCoordinator(hass, api(client), "123456", {"stale_grace": 60})
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=300)
+
+    client.reachable = False
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=15)
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=300)
+
+    # Past the grace period the charger stays on its regular interval
+    later = coordinator.data["received_at"] + timedelta(seconds=61)
+    monkeypatch.setattr(dt_util, "utcnow", lambda: later)
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.update_interval == timedelta(seconds=300)
+
+
+async def test_fleet_polls_due_chargers_together(hass, working_info_frame, monkeypatch):
+    """Test one fleet cycle refreshes every due charger with bounded concurrency."""
+    client = FakeClient(working_info_frame())
+    in_flight = peak = 0
+    get_snapshot = client.get_charger_snapshot
+
+    async def slow_snapshot(charger_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return await get_snapshot(charger_id)
+
+    monkeypatch.setattr(client, "get_charger_snapshot", slow_snapshot)
+    fleet = EVMeterFleet(hass, api(client), max_concurrent=2)
+    coordinators = [
+        EVMeterCoordinator(hass, api(client), str(charger_id), fleet=fleet)
+        for charger_id in range(5)
+    ]
+    for coordinator in coordinators:
+        # Due at once, so the first cycle takes all of them
+        coordinator.update_interval = timedelta(0)
+        coordinator.async_add_listener(lambda: None)
+    assert fleet._timer is not None
+
+    fleet._start_cycle()
+    await asyncio.gather(*hass._background_tasks)
+
+    assert fleet.last_cycle_size == 5
+    assert peak == 2
+    assert all(data is not None for data in fleet.data.values())
+    # Every charger booked its next poll with the fleet, not its own timer
+    assert set(fleet._due) == set(coordinators)
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+    assert fleet.members == {}
+    assert fleet._timer is None
+
+
+async def test_first_refresh_tolerates_offline_chargers(hass, working_info_frame):
+    """Test the background first refresh neither raises nor stops polling."""
+    client = FakeClient(working_info_frame())
+    client.reachable = False
+    fleet = EVMeterFleet(hass, api(client))
+    coordinators = [
+        EVMeterCoordinator(hass, api(client), str(charger_id), fleet=fleet)
+        for charger_id in range(3)
+    ]
+    for coordinator in coordinators:
+        coordinator.async_add_listener(lambda: None)
+
+    await fleet.async_refresh_all(coordinators)
+
+    assert not any(coordinator.last_update_success for coordinator in coordinators)
+    # Each charger keeps retrying on its poll interval
+    assert set(fleet._due) == set(coordinators)
+
+    client.reachable = True
+    await fleet.async_refresh_all(coordinators)
+    assert all(data is not None for data in fleet.data.values())
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+
+
+async def test_timings_summarized_only_when_read(hass, working_info_frame, monkeypatch):
+    """Test frames record timings without summarizing them into the data."""
+    client = FakeClient(working_info_frame())
+    coordinator = EVMeterCoordinator(hass, api(client), "123456")
+
+    def not_per_frame(self, stage):
+        raise AssertionError("timings summarized for a frame")
+
+    monkeypatch.setattr(StageTimings, "stage_summary", not_per_frame)
+    await coordinator.async_refresh()
+    first = coordinator.data
+    await coordinator.async_refresh()
+
+    assert coordinator.data["timings"] is first["timings"] is coordinator.timings
+    assert coordinator.data["connection_timings"] is client.timings
+    await coordinator.async_shutdown()
+
+
+async def test_warm_start_from_saved_frame(hass, working_info_frame):
+    """Test a saved frame is restored with its age after a restart."""
+    frame = working_info_frame(charger_id=111, set_current=11)
+    response = parse_blewifi_payload(frame) | {"frame": frame}
+    client = FakeClient(frame)
+    client._response = response
+    store = EVMeterSnapshotStore(hass, "entry")
+    coordinator = EVMeterCoordinator(hass, api(client), "111", store=store)
+    await coordinator.async_refresh()
+    received_at = coordinator.data["received_at"]
+    await store.async_flush()
+    await coordinator.async_shutdown()
+
+    # After the restart
+    saved = await EVMeterSnapshotStore(hass, "entry").async_load()
+    assert saved == {"111": (frame, received_at)}
+    restored = EVMeterCoordinator(hass, api(client), "111")
+    restored.async_restore(*saved["111"])
+
+    assert restored.data["status"].set_current == 11
+    assert restored.data["received_at"] == received_at
+    await restored.async_shutdown()
+
+
+async def test_snapshot_written_while_frames_keep_arriving(
+    hass, working_info_frame, monkeypatch
+):
+    """Test frames arriving faster than the save delay do not postpone the write."""
+    monkeypatch.setattr(storage, "SNAPSHOT_SAVE_DELAY", 0.1)
+    store = EVMeterSnapshotStore(hass, "entry")
+    written: list[dict] = []
+
+    async def save(data):
+        written.append(data)
+
+    monkeypatch.setattr(store._store, "async_save", save)
+    for set_current in range(10):
+        store.async_save_frame(
+            "111", working_info_frame(set_current=set_current), dt_util.utcnow()
+        )
+        await asyncio.sleep(0.03)
+
+    assert len(written) >= 2
+    await store.async_flush()
+    assert written[-1]["111"]["frame"] == working_info_frame(set_current=9).hex()
+
+
+async def test_breaker_probes_charger_that_keeps_timing_out(hass, working_info_frame):
+    """Test repeated timeouts open the breaker and a pushed frame closes it."""
+    frame = working_info_frame(charger_id=0x7C9EBD4757CE)
+    client = FakeClient(frame)
+    coordinator = EVMeterCoordinator(
+        hass, api(client), "7C9EBD4757CE", {"stale_grace": 3600}
+    )
+    await coordinator.async_refresh()
+
+    client.reachable = False
+    for _ in range(2):
+        await coordinator.async_refresh()
+    assert not coordinator.breaker.is_open
+    assert coordinator.update_interval == timedelta(seconds=10)
+
+    await coordinator.async_refresh()
+    assert coordinator.breaker.is_open
+    assert coordinator.update_interval == timedelta(seconds=60)
+    assert coordinator.data["breaker"]["request_breaker"] == "open"
+    await coordinator.async_refresh()
+    assert coordinator.update_interval == timedelta(seconds=120)
+
+    coordinator._handle_pushed_frame(parse_blewifi_payload(frame))
+    assert not coordinator.breaker.is_open
+    assert coordinator.data["breaker"]["request_breaker"] == "closed"
+    assert coordinator.update_interval == timedelta(seconds=10)
+    await coordinator.async_shutdown()
+
+
+async def test_single_push_keeps_the_charging_interval(
+    hass, working_info_frame, monkeypatch
+):
+    """Test polling only drops to the heartbeat while pushes keep arriving."""
+    frame = working_info_frame(charger_id=0x7C9EBD4757CE)
+    pushed = parse_blewifi_payload(frame)
+    coordinator = EVMeterCoordinator(hass, api(FakeClient(frame)), "7C9EBD4757CE")
+    clock = [1000.0]
+    monkeypatch.setattr(
+        coordinator_module, "time", SimpleNamespace(monotonic=lambda: clock[0])
+    )
+
+    coordinator._handle_pushed_frame(pushed)
+    assert coordinator.update_interval == timedelta(seconds=10)
+
+    # A push every 5 s is more often than the charging interval polls
+    clock[0] += 5
+    coordinator._handle_pushed_frame(pushed)
+    assert coordinator.update_interval == timedelta(seconds=300)
+
+    # Pushes 30 s apart are not
+    clock[0] += 30
+    coordinator._handle_pushed_frame(pushed)
+    assert coordinator.update_interval == timedelta(seconds=10)
+    await coordinator.async_shutdown()
+
+
+class AnsweringMqttClient:
+    """Answer every published command with a charger's frame."""
+
+    def __init__(self, client: EVMeterApiClient, frame: bytes) -> None:
+        self._client = client
+        self._frame = frame
+
+    async def publish(self, topic, payload=None, qos=0):
+        asyncio.get_running_loop().call_soon(self._client._handle_payload, self._frame)
+
+
+async def test_breaker_stays_closed_for_answering_hex_id_charger(
+    hass, working_info_frame
+):
+    """Test a charger with a documented hex ID keeps being polled normally."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="test-user"))
+    client._client = cast(
+        aiomqtt.Client,
+        AnsweringMqttClient(client, working_info_frame(charger_id=0x7C9EBD4757CE)),
+    )
+    client._set_state(ConnectionState.CONNECTED)
+    coordinator = EVMeterCoordinator(hass, client, "7C9EBD4757CE")
+
+    for _ in range(5):
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+
+    assert not coordinator.breaker.is_open
+    assert coordinator.breaker.consecutive_timeouts == 0
+    assert coordinator.data["breaker"]["request_breaker"] == "closed"
+    await coordinator.async_shutdown()
@@ -0,0 +1,51 @@
+"""Test the zero-copy WorkingInfo decoder."""
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from evmeter_client.parser import parse_blewifi_payload  # noqa: E402
+
+from custom_components.evmeter.decoder import decode_response  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {},
+        {"kubis_version": "", "wifi_network": ""},
+        {"limit": 32, "charging_state": 0x09, "phase_type": 0x07, "grid_type": 0x09},
+    ],
+)
+def test_decode_matches_library_parser(working_info_frame, fields):
+    """Test the decoder yields the same WorkingInfo as the library parser."""
+    frame = working_info_frame(**fields)
+    expected = parse_blewifi_payload(frame)
+
+    decoded = decode_response(frame)
+
+    assert decoded["type"] == expected["type"]
+    assert decoded["status"] == expected["status"]
+    assert decoded["working_info"] == expected["working_info"]
+
+
+def test_working_info_is_a_plain_dict(working_info_frame):
+    """Test every field, strings included, is present without being read."""
+    working_info = decode_response(working_info_frame())["working_info"]
+
+    assert type(working_info) is dict
+    assert (
+        working_info.keys()
+        == parse_blewifi_payload(working_info_frame())["working_info"].keys()
+    )
+    assert "wifi" in working_info
+    assert working_info["wifi"] == "garage"
+
+
+def test_truncated_frame_falls_back_to_library(working_info_frame):
+    """Test a frame cut short is handed to the library parser."""
+    frame = working_info_frame()
+    truncated = frame[:20]
+    truncated = (len(truncated) - 2).to_bytes(2, "little") + truncated[2:]
+
+    assert decode_response(truncated) == parse_blewifi_payload(truncated)
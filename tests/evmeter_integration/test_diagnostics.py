@@ -0,0 +1,68 @@
+"""Test the EV-Meter config entry diagnostics."""
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from evmeter_client import EVMeterConfig  # noqa: E402
+
+from custom_components.evmeter.api import EVMeterApiClient  # noqa: E402
+from custom_components.evmeter.breaker import CircuitBreaker  # noqa: E402
+from custom_components.evmeter.const import DOMAIN  # noqa: E402
+from custom_components.evmeter.diagnostics import (  # noqa: E402
+    async_get_config_entry_diagnostics,
+)
+from custom_components.evmeter.frames import FrameLog  # noqa: E402
+from custom_components.evmeter.timing import StageTimings  # noqa: E402
+
+
+def test_frame_log_keeps_the_latest_frames():
+    """Test the ring overwrites the oldest frames once full."""
+    log = FrameLog(size=3)
+    assert log.entries() == []
+
+    for index in range(5):
+        log.append(float(index), bytes([index]))
+
+    assert len(log) == 3
+    assert log.entries() == [(2.0, b"\x02"), (3.0, b"\x03"), (4.0, b"\x04")]
+
+
+async def test_diagnostics_dump_connection_timings_and_frames(working_info_frame):
+    """Test diagnostics hold the connection, timings and raw frames."""
+    client = EVMeterApiClient(EVMeterConfig(user_id="secret-user"))
+    frame = working_info_frame(charger_id=0x7C9EBD4757CE, trailer=b"secret-user")
+    client._handle_payload(frame)
+    # Another entry's charger on the same pooled client
+    client._handle_payload(working_info_frame(charger_id=222, trailer=b"secret-user"))
+    coordinator = SimpleNamespace(
+        client=client,
+        charger_id="7C9EBD4757CE",
+        data=None,
+        last_update_success=False,
+        update_interval=timedelta(seconds=60),
+        timings=StageTimings(),
+        breaker=CircuitBreaker(),
+    )
+    entry = SimpleNamespace(
+        entry_id="entry",
+        data={"user_id": "secret-user", "charger_id": "7C9EBD4757CE"},
+        options={},
+    )
+    hass = SimpleNamespace(data={DOMAIN: {"entry": {"7C9EBD4757CE": coordinator}}})
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"]["user_id"] == "**REDACTED**"
+    assert diagnostics["connection"]["state"] == "disconnected"
+    assert diagnostics["connection"]["reconnects"] == 0
+    assert diagnostics["chargers"]["7C9EBD4757CE"]["update_interval"] == 60
+    assert diagnostics["chargers"]["7C9EBD4757CE"]["round_trip"]["srtt"] is None
+    assert [entry["payload"] for entry in diagnostics["frames"]] == [
+        frame.removesuffix(b"secret-user").hex()
+    ]
+    assert b"secret-user".hex() not in str(diagnostics)
+    assert "secret-user" not in str(diagnostics)
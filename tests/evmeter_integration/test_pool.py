@@ -0,0 +1,105 @@
+"""Test the shared EV-Meter connection pool."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from evmeter_client import EVMeterConfig  # noqa: E402
+from evmeter_client.exceptions import EVMeterTimeoutError  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.evmeter import async_setup_entry, config_flow  # noqa: E402
+from custom_components.evmeter.api import EVMeterApiClient  # noqa: E402
+from custom_components.evmeter.const import DATA_FLEETS, DOMAIN  # noqa: E402
+from custom_components.evmeter.pool import (  # noqa: E402
+    EVMeterConnectionPool,
+    get_connection_pool,
+)
+
+
+async def test_clients_shared_per_user_and_released(monkeypatch):
+    """Test entries of one user share a client until the last one releases."""
+    started: list[str] = []
+    stopped: list[str] = []
+
+    async def fake_stop(self):
+        stopped.append(self.config.user_id)
+
+    monkeypatch.setattr(
+        EVMeterApiClient,
+        "async_start",
+        lambda self: started.append(self.config.user_id),
+    )
+    monkeypatch.setattr(EVMeterApiClient, "async_stop", fake_stop)
+
+    pool = EVMeterConnectionPool()
+    first = pool.acquire(EVMeterConfig(user_id="user-a"))
+    second = pool.acquire(EVMeterConfig(user_id="user-a"))
+    other = pool.acquire(EVMeterConfig(user_id="user-b"))
+
+    assert first is second
+    assert other is not first
+    assert started == ["user-a", "user-b"]
+
+    await pool.async_release(first)
+    assert stopped == []
+    await pool.async_release(second)
+    assert stopped == ["user-a"]
+
+    # A later entry for the same user gets a fresh client
+    assert pool.acquire(EVMeterConfig(user_id="user-a")) is not first
+
+
+async def test_validation_keeps_connection_warm(tmp_path, monkeypatch):
+    """Test validation gives up quickly and keeps the connection for the entry."""
+    hass = HomeAssistant(str(tmp_path))
+
+    async def no_reply(self, charger_id, timeout=None):
+        await asyncio.sleep(timeout)
+        raise EVMeterTimeoutError("No response")
+
+    async def connected(self, timeout):
+        pass
+
+    monkeypatch.setattr(EVMeterApiClient, "async_start", lambda self: None)
+    monkeypatch.setattr(EVMeterApiClient, "async_wait_connected", connected)
+    monkeypatch.setattr(EVMeterApiClient, "get_charger_snapshot", no_reply)
+    monkeypatch.setattr(config_flow, "VALIDATION_PROBE_TIMEOUT", 0.01)
+
+    info = await config_flow.validate_input(
+        hass, {"charger_id": "123456", "user_id": "user-a"}
+    )
+    assert info["title"] == "EV-Meter Charger 123456"
+
+    pool = get_connection_pool(hass)
+    client = pool.acquire(EVMeterConfig(user_id="user-a"))
+    assert pool._refcounts[pool._key(client.config)] == 2
+    await hass.async_stop(force=True)
+
+
+async def test_failed_setup_releases_client(tmp_path, monkeypatch):
+    """Test an entry whose setup fails gives back its client and fleet."""
+    hass = HomeAssistant(str(tmp_path))
+    monkeypatch.setattr(EVMeterApiClient, "async_start", lambda self: None)
+
+    async def fail_forward(entry, platforms):
+        raise RuntimeError("platform setup failed")
+
+    hass.config_entries = SimpleNamespace(async_forward_entry_setups=fail_forward)
+    entry = SimpleNamespace(
+        entry_id="entry",
+        data={"user_id": "user-a", "charger_id": "123456"},
+        options={},
+        async_on_unload=lambda func: None,
+    )
+
+    with pytest.raises(RuntimeError):
+        await async_setup_entry(hass, entry)
+
+    assert get_connection_pool(hass)._clients == {}
+    assert hass.data[DOMAIN][DATA_FLEETS] == {}
+    assert "entry" not in hass.data[DOMAIN]
+    await hass.async_stop(force=True)
@@ -0,0 +1,111 @@
+"""Test the EV-Meter sensor descriptions."""
+
+import time
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from evmeter_client.parser import parse_blewifi_payload  # noqa: E402
+
+from custom_components.evmeter.api import snapshot_from_response  # noqa: E402
+from custom_components.evmeter.coordinator import EVMeterCoordinator  # noqa: E402
+from custom_components.evmeter.sensor import (  # noqa: E402
+    SENSOR_TYPES,
+    EVMeterSensor,
+)
+from custom_components.evmeter.timing import StageTimings  # noqa: E402
+
+
+def test_value_fn_reads_every_sensor(working_info_frame):
+    """Test every description reads its value straight from coordinator data."""
+    snapshot = snapshot_from_response(
+        "123456", parse_blewifi_payload(working_info_frame())
+    )
+    received_at = datetime(2024, 1, 1, tzinfo=UTC)
+    timings = StageTimings()
+    timings.record("publish", 0.0405)
+    data = {
+        "status": snapshot.status,
+        "metrics": snapshot.metrics,
+        "received_at": received_at,
+        "breaker": {"request_breaker": "closed", "probe_interval": None},
+        "session": {
+            "duration": 5400.0,
+            "average_power": 7.2,
+            "peak_power": 11.0,
+            "peak_currents": (16.0, 15.5, 16.2),
+            "phase_imbalance": 2.1,
+        },
+        "timings": timings,
+        "connection_timings": StageTimings(),
+    }
+
+    values = {
+        description.key: description.value_fn(data) for description in SENSOR_TYPES
+    }
+
+    assert len(values) == len(SENSOR_TYPES)
+    assert values["status"] == "Connected"
+    assert values["charging_state"] == "Charging (3 Phase)"
+    assert values["voltage_ph1"] == 230.0
+    assert values["current_ph1"] == 16.0
+    assert values["session_energy"] == 4.2
+    assert values["wifi_network"] == "garage"
+    assert values["ping_latency"] == 25
+    assert values["data_received"] == received_at
+    assert values["session_duration"] == 90.0
+    assert values["session_peak_current"] == 16.2
+    assert values["publish_latency"] == 40.5
+    assert values["connect_latency"] is None
+
+
+def test_deadband_skips_small_changes(working_info_frame, monkeypatch):
+    """Test jitter inside the deadband is written only after max silence."""
+    coordinator = SimpleNamespace(
+        charger_id="123456", device_info={}, last_update_success=True, data=None
+    )
+    description = next(d for d in SENSOR_TYPES if d.key == "voltage_ph1")
+    sensor = EVMeterSensor(
+        cast(EVMeterCoordinator, coordinator), description, deadband=1.0, max_silence=60
+    )
+    now = 1000.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+
+    def update(raw_voltage):
+        snapshot = snapshot_from_response(
+            "123456",
+            parse_blewifi_payload(working_info_frame(voltages=(raw_voltage, 0, 0))),
+        )
+        coordinator.data = {"status": snapshot.status, "metrics": snapshot.metrics}
+        return sensor._is_significant_update()
+
+    assert update(920)  # 230.0 V, first value
+    assert not update(921)  # 230.25 V
+    assert update(925)  # 231.25 V
+    now += 61
+    assert update(924)  # Heartbeat after max silence
+
+
+def test_deadband_writes_attribute_changes(monkeypatch):
+    """Test a value inside the deadband is written when its attributes change."""
+    coordinator = SimpleNamespace(
+        charger_id="123456", device_info={}, last_update_success=True, data=None
+    )
+    description = next(d for d in SENSOR_TYPES if d.key == "session_peak_current")
+    sensor = EVMeterSensor(
+        cast(EVMeterCoordinator, coordinator), description, deadband=0.2, max_silence=60
+    )
+    monkeypatch.setattr(time, "monotonic", lambda: 1000.0)
+
+    def update(*peaks):
+        coordinator.data = {"session": {"peak_currents": peaks}}
+        return sensor._is_significant_update()
+
+    assert update(16.0, 15.0, 14.0)
+    assert not update(16.0, 15.0, 14.0)
+    # The peak is unchanged, but another phase's peak moved
+    assert update(16.0, 15.9, 14.0)
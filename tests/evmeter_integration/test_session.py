@@ -0,0 +1,59 @@
+"""Test the EV-Meter charging session statistics."""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.evmeter.session import (  # noqa: E402
+    ChargingSession,
+    phase_imbalance,
+)
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def metrics(power=0.0, currents=(0.0, 0.0, 0.0), energy=0.0):
+    """Return the metrics the session reads from a frame."""
+    return SimpleNamespace(
+        power_kw=power,
+        current_ph1=currents[0],
+        current_ph2=currents[1],
+        current_ph3=currents[2],
+        session_energy_kwh=energy,
+    )
+
+
+def test_phase_imbalance():
+    """Test imbalance is the largest deviation from the mean phase current."""
+    assert phase_imbalance((16.0, 16.0, 16.0)) == 0
+    assert phase_imbalance((18.0, 15.0, 15.0)) == pytest.approx(12.5)
+    assert phase_imbalance((0.0, 0.0, 0.0)) is None
+
+
+def test_session_runs_from_charging_start_to_end():
+    """Test figures accumulate while charging and are kept after it ends."""
+    session = ChargingSession()
+    session.update(START, False, metrics())
+    assert session.as_dict(START)["duration"] is None
+
+    session.update(START, True, metrics(11.0, (16.0, 16.0, 16.0), 1.0), True)
+    half_hour = START + timedelta(minutes=30)
+    session.update(half_hour, True, metrics(7.0, (18.0, 15.0, 15.0), 5.0), True)
+    hour = START + timedelta(hours=1)
+    session.update(hour, True, metrics(7.0, (18.0, 15.0, 15.0), 9.0), True)
+    session.update(hour + timedelta(minutes=5), False, metrics(energy=9.0))
+
+    figures = session.as_dict(START + timedelta(hours=3))
+    assert not session.active
+    assert figures["duration"] == 3900
+    assert figures["average_power"] == pytest.approx(8 / (3900 / 3600))
+    assert figures["peak_power"] == 11.0
+    assert figures["peak_currents"] == (18.0, 16.0, 16.0)
+    # 30 minutes balanced, then 35 minutes at 12.5 %
+    assert figures["phase_imbalance"] == pytest.approx(12.5 * 35 / 65)
+
+    session.update(hour + timedelta(hours=2), True, metrics(3.7, (16.0, 0, 0), 0.0))
+    assert session.as_dict(hour + timedelta(hours=2))["peak_power"] == 3.7
@@ -0,0 +1,51 @@
+"""Test the integration client against the local charger simulator."""
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from evmeter_client import EVMeterConfig  # noqa: E402
+from evmeter_client.exceptions import EVMeterTimeoutError  # noqa: E402
+
+from custom_components.evmeter.api import EVMeterApiClient  # noqa: E402
+from simulator import ChargerFleet, MqttBroker, topic_matches  # noqa: E402
+
+
+def test_topic_matches_wildcards():
+    """Test subscription filters with single and multi-level wildcards."""
+    assert topic_matches("/BLEWIFI/users/+", "/BLEWIFI/users/abc")
+    assert topic_matches("/BLEWIFI/#", "/BLEWIFI/Chargers/1")
+    assert not topic_matches("/BLEWIFI/users/+", "/BLEWIFI/users/abc/x")
+    assert not topic_matches("/BLEWIFI/users/abc", "/BLEWIFI/users/abd")
+
+
+async def test_fleet_answers_over_mqtt():
+    """Test simulated chargers answer real client requests through the broker."""
+    broker = MqttBroker(port=0)
+    await broker.start()
+    fleet = ChargerFleet(broker, "test-user", 3, first_id=500, latency=0, jitter=0)
+    client = EVMeterApiClient(
+        EVMeterConfig(
+            mqtt_host=broker.host,
+            mqtt_port=broker.port,
+            user_id="test-user",
+            response_timeout=1,
+        )
+    )
+    client.async_start()
+    try:
+        await client.async_wait_connected(5)
+        snapshots = [await client.get_charger_snapshot(cid) for cid in fleet.chargers]
+        assert [snapshot.status.charger_id for snapshot in snapshots] == [
+            "0000000001F4",
+            "0000000001F5",
+            "0000000001F6",
+        ]
+
+        fleet.drop_rate = 1.0
+        with pytest.raises(EVMeterTimeoutError):
+            await client.get_charger_snapshot("0000000001F4")
+        assert fleet.dropped == 1
+    finally:
+        await client.async_stop()
+        await broker.stop()